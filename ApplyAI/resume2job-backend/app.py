@@ -2,26 +2,27 @@ from fastapi import FastAPI, File, UploadFile, Form, Request, Query, HTTPExcepti
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import json
-from utils.docling_utils import parse_resume
-from utils.llm_utils import extract_structured_resume, match_jobs_llm
-from utils.firebase_utils import init_firebase, fetch_job_listings, ensure_collections_exist, ensure_messages_collection_exists
-from utils.job_matching import tfidf_cosine_match, match_and_sort_jobs
-import tempfile
+from utils.parse_pool import ParseQueueFull, parse_pool
+from utils.parse_cache import parse_cache
+from utils.docling_utils import SECTION_HEADERS, pdf_text_and_links
+from utils.llm_utils import extract_structured_resume
+from utils.job_matching import match_and_sort_jobs
+from utils.repository import open_repository
+from utils.warmup import Warmup
+from utils.firestore_paging import MAX_PAGE_SIZE
+from utils.job_features import FEATURES_FIELD, canonical_employment_type, compute_features, stored_features
 import os
 import json
 from pydantic import BaseModel
-from typing import List, Optional, Any
+from typing import List, Optional
 import re
-from rapidfuzz import process as fuzz_process
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
 import ast
-import spacy
 from fastapi.responses import JSONResponse
-import firebase_admin.firestore as firestore
-import firebase_admin.auth as admin_auth
 from datetime import datetime
 import json
+import uuid
+import asyncio
+import threading
 
 app = FastAPI()
 app.add_middleware(
@@ -31,16 +32,92 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-db = init_firebase()
-ensure_collections_exist(db)
-ensure_messages_collection_exists(db)
+# Storage backend picked by STORAGE_BACKEND (Firestore by default, or SQLite)
+repo = open_repository()
+
+# Prebuilt TF-IDF job description index (python manage.py build-tfidf-index), optional; loaded by warm-up
+TFIDF_INDEX_PATH = os.environ.get("TFIDF_INDEX_PATH", "tfidf_index.joblib")
+tfidf_index = None
+# Jobs collection cached in memory and kept current with the backend; opened by warm-up
+job_catalog = None
+
+def load_tfidf_index():
+    global tfidf_index
+    if not os.path.exists(TFIDF_INDEX_PATH):
+        return
+    from utils.tfidf_index import TfidfJobIndex
+    tfidf_index = TfidfJobIndex.load(TFIDF_INDEX_PATH)
+    print(f"Loaded TF-IDF index with {len(tfidf_index)} jobs from {TFIDF_INDEX_PATH}")
+
+def open_job_catalog():
+    global job_catalog
+    job_catalog = repo.job_catalog(tfidf_index)
 
 GEMINI_API_KEY = "REPLACE WITH YOU GEMINI API KEY"
 GEMINI_MODEL = "gemini-2.5-flash-lite-preview-06-17"
 GEMINI_BASE_URL = 'https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent'  # For reference, not used directly by LangChain
 
-# Load spaCy model globally
-nlp = spacy.load("en_core_web_sm")
+# spaCy model, loaded by warm-up or on first use
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load("en_core_web_sm")
+    return _nlp
+
+def import_langchain():
+    from langchain_google_genai import ChatGoogleGenerativeAI  # noqa: F401
+    from langchain.prompts import ChatPromptTemplate  # noqa: F401
+
+# Heavy dependencies load in the background once the server is up; /ready reports progress
+warmup = Warmup()
+warmup.add("tfidf_index", load_tfidf_index, required=False)
+warmup.add("job_catalog", open_job_catalog)
+warmup.add("spacy", get_nlp)
+warmup.add("docling", parse_pool.warm)
+warmup.add("langchain", import_langchain)
+
+@app.on_event("startup")
+async def start_warmup():
+    warmup.start()
+
+@app.on_event("shutdown")
+async def stop_parse_workers():
+    parse_pool.close()
+
+@app.get("/health")
+async def health():
+    # Liveness: the process is up and serving requests
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    catalog_ready = job_catalog is not None and job_catalog.ready
+    body = {
+        "ready": warmup.ready and catalog_ready,
+        "warmup": warmup.status(),
+        "job_catalog": {"ready": catalog_ready, "version": job_catalog.version if job_catalog is not None else None},
+        "parsing": parse_pool.metrics(),
+    }
+    return JSONResponse(body, status_code=status.HTTP_200_OK if body["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@app.get("/metrics/parsing")
+async def parsing_metrics():
+    # Queue depth, rejections and wait / parse time percentiles of the resume parsing pool,
+    # and hit / miss counters of the parsed resume cache
+    return {**parse_pool.metrics(), "cache": parse_cache.stats()}
+
+def parsing_busy(e):
+    return JSONResponse(
+        {"success": False, "error": str(e)},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(e.retry_after)}
+    )
 
 class JobMatch(BaseModel):
     job_id: Optional[str]
@@ -57,6 +134,7 @@ class JobMatch(BaseModel):
     edu_score: Optional[float] = 0.0
     matched_skills: Optional[List[str]] = []
     missing_skills: Optional[List[str]] = []
+    tfidf_score: Optional[float] = None
     llm_reason: Optional[str] = ""
     reason: Optional[str] = ""
 
@@ -122,6 +200,9 @@ class MatchResponse(BaseModel):
     resume_data: Optional[ResumeData] = None
     fallback: Optional[bool] = False
     error: Optional[str] = None
+    total: Optional[int] = None  # Number of jobs ranked, for paging
+    next_offset: Optional[int] = None  # Offset of the next page, None on the last page
+    catalog_version: Optional[int] = None  # Job catalog version the page was ranked against
 
     class Config:
         json_schema_extra = {
@@ -176,12 +257,6 @@ KNOWN_SKILLS = [
     'ci/cd', 'material ui', 'framer motion', 'three.js', 'heroku', 'vercel', 'netlify', 'oop', 'object oriented programming', 'trello', 'notion', 'slack',
 ]
 
-SECTION_HEADERS = {
-    'skills': ["skills", "skill set", "technical skills", "core skills"],
-    'experience': ["experience", "professional experience", "work history", "experiences"],
-    'education': ["education", "educations", "education & certifications", "academic background"]
-}
-
 # Advanced regex extraction
 import difflib
 
@@ -195,6 +270,7 @@ def find_section(lines, section_names):
     return indices
 
 def extract_fields_from_markdown_advanced(markdown):
+    from rapidfuzz import process as fuzz_process
     skills = set()
     experience = []
     education = []
@@ -296,7 +372,7 @@ def extract_fields_from_markdown_advanced(markdown):
                 skills.add(known_skill)
     # NLP-based skill extraction from the entire resume text (supplemental)
     def extract_skills_nlp(text, known_skills):
-        doc = nlp(text.lower())
+        doc = get_nlp()(text.lower())
         found_skills = set()
         for skill in known_skills:
             skill_lower = skill.lower()
@@ -315,6 +391,8 @@ def extract_fields_from_markdown_advanced(markdown):
     }
 
 def extract_with_gemini(doc_markdown):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain.prompts import ChatPromptTemplate
     prompt = ChatPromptTemplate.from_template(
         '''
         Extract the following fields from this resume:
@@ -364,6 +442,8 @@ def merge_extraction(regex_fields, llm_fields):
     return merged
 
 def llm_match_and_reason(resume_data, job):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain.prompts import ChatPromptTemplate
     prompt = ChatPromptTemplate.from_template(
         """
         Candidate Resume:
@@ -446,19 +526,9 @@ def llm_match_and_reason(resume_data, job):
         }
 
 def normalize_job(job, idx=0):
-    # Canonicalize employment type
-    raw_employment = job.get("employment_type") or job.get("employment") or ""
-    employment_type = ""
-    if isinstance(raw_employment, str):
-        emp = raw_employment.strip().lower().replace('-', ' ').replace('_', ' ')
-        if 'full' in emp:
-            employment_type = 'Full Time'
-        elif 'part' in emp:
-            employment_type = 'Part Time'
-        elif 'intern' in emp:
-            employment_type = 'Internship'
-        else:
-            employment_type = raw_employment.strip()
+    # Canonical employment type, precomputed when the job was stored
+    features = stored_features(job)
+    employment_type = features["employment_type"] if features else canonical_employment_type(job)
     return {
         "job_id": job.get("job_id") or job.get("id") or str(idx),
         "title": job.get("title", ""),
@@ -474,11 +544,28 @@ def normalize_job(job, idx=0):
         "edu_score": job.get("edu_score", 0.0),
         "matched_skills": job.get("matched_skills", []),
         "missing_skills": job.get("missing_skills", []),
+        "tfidf_score": job.get("tfidf_score"),
         "llm_reason": job.get("llm_reason", ""),
         "reason": job.get("reason", ""),
         "recruiterId": job.get("recruiterId") or job.get("recruiterID") or "",
     }
 
+async def request_jobs(jobs):
+    """
+    (job_listings, job_matrix, tfidf_index, catalog_version) for a request: the posted jobs,
+    otherwise one snapshot of the cached catalog (fetched directly until it has loaded).
+    """
+    if jobs:
+        return json.loads(jobs), None, tfidf_index, None
+    if job_catalog is not None and job_catalog.ready:
+        snapshot = job_catalog.snapshot()
+        return snapshot.jobs, snapshot.job_matrix, snapshot.tfidf_index, snapshot.version
+    return await repo.all_jobs(), None, tfidf_index, None
+
+def next_page_offset(offset, page, total):
+    next_offset = offset + len(page)
+    return next_offset if next_offset < total else None
+
 @app.post("/match-resume", response_model=MatchResponse, responses={
     200: {
         "description": "Top job matches with compatibility %",
@@ -493,8 +580,11 @@ async def match_resume(
     resume: UploadFile = File(None),
     jobs: str = Form(None),
     use_llm: bool = Form(False),
+    high_fidelity: bool = Form(False),
     manual_skills: str = Form(None),
-    manual_experience: str = Form(None)
+    manual_experience: str = Form(None),
+    limit: Optional[int] = Form(None, ge=1),
+    offset: int = Form(0, ge=0)
 ):
     print('Received /match-resume request')
     
@@ -519,12 +609,14 @@ async def match_resume(
         
         # Get job listings
         try:
-            job_listings = json.loads(jobs) if jobs else fetch_job_listings(db)
+            job_listings, job_matrix, _, catalog_version = await request_jobs(jobs)
             print(f'Found {len(job_listings)} jobs')
             
-            # Match jobs with the provided skills and experience
-            sorted_jobs = match_and_sort_jobs(skills, job_listings, experience, [])
-            normalized_matches = [normalize_job(job, idx) for idx, job in enumerate(sorted_jobs)]
+            # Match jobs with the provided skills and experience (only the requested page)
+            sorted_jobs = await asyncio.to_thread(
+                match_and_sort_jobs, skills, job_listings, experience, [], job_matrix=job_matrix, limit=limit, offset=offset
+            )
+            normalized_matches = [normalize_job(job, idx) for idx, job in enumerate(sorted_jobs, start=offset)]
             
             # Prepare resume data
             resume_data = ResumeData(
@@ -543,7 +635,10 @@ async def match_resume(
                 matches=normalized_matches, 
                 resume_data=resume_data, 
                 fallback=True, 
-                error=None
+                error=None,
+                total=len(job_listings),
+                next_offset=next_page_offset(offset, normalized_matches, len(job_listings)),
+                catalog_version=catalog_version
             )
             
         except Exception as e:
@@ -566,46 +661,57 @@ async def match_resume(
             error="No resume file or manual data provided"
         )
     
-    # Save uploaded file to temp
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(resume.filename)[-1]) as tmp:
-        tmp.write(await resume.read())
-        tmp_path = tmp.name
-    
+    content = await resume.read()
     try:
-        print('Parsing resume...')
-        try:
-            docling_result = parse_resume(tmp_path)
-        except Exception as e:
-            print(f"Docling parse failed: {e}")
-            docling_result = None
-            
-        if not docling_result or any(x is None for x in docling_result):
-            print('Docling failed or returned None, falling back to plain text and Gemini LLM extraction...')
-            # Try to extract plain text for LLM
-            import fitz
-            plain_text = ''
-            links = []
+        # A repeat upload of the same file skips parsing and field extraction entirely
+        cached = await asyncio.to_thread(parse_cache.get, content)
+        if cached and high_fidelity and cached["path"] != "docling":
+            # Only the PyMuPDF text is cached; this request wants Docling's conversion
+            cached = None
+        if cached:
+            print('Parsed resume found in cache')
+            doc_markdown, links, plain_text = cached["markdown"], cached["links"], cached["plain_text"]
+            regex_fields = cached["fields"]
+        else:
+            print('Parsing resume...')
             try:
-                doc = fitz.open(tmp_path)
-                for page in doc:
-                    plain_text += page.get_text()
-                    for link in page.get_links():
-                        if link.get("uri"):
-                            links.append(link["uri"])
+                # In a parse worker process, from the upload's bytes, so the event loop keeps serving other requests.
+                # Born-digital PDFs with a good text layer skip Docling unless high_fidelity is asked for
+                parsed = await parse_pool.parse(content, resume.filename, high_fidelity)
+            except ParseQueueFull as e:
+                return parsing_busy(e)
             except Exception as e:
-                print(f"[PyMuPDF fallback] Error extracting links/text: {e}")
-                return MatchResponse(
-                    matches=[],
-                    resume_data=None,
-                    fallback=True,
-                    error="Failed to extract text from the resume. Please try again or enter your information manually."
-                )
-            doc_markdown = plain_text or ''
-        else:
-            doc_markdown, links, plain_text = docling_result
+                print(f"Docling parse failed: {e}")
+                parsed = None
             
-        print('Extracting fields with regex...')
-        regex_fields = extract_fields_from_markdown_advanced(doc_markdown)
+            if not parsed or parsed.markdown is None:
+                print('Docling failed or returned None, falling back to plain text and Gemini LLM extraction...')
+                # Try to extract plain text for LLM; the parse worker already did unless it failed outright
+                try:
+                    if parsed and parsed.plain_text:
+                        links, plain_text = parsed.links, parsed.plain_text
+                    else:
+                        plain_text, links = await asyncio.to_thread(pdf_text_and_links, content, resume.filename)
+                except Exception as e:
+                    print(f"[PyMuPDF fallback] Error extracting links/text: {e}")
+                    return MatchResponse(
+                        matches=[],
+                        resume_data=None,
+                        fallback=True,
+                        error="Failed to extract text from the resume. Please try again or enter your information manually."
+                    )
+                doc_markdown = plain_text or ''
+            else:
+                doc_markdown, links, plain_text = parsed.markdown, parsed.links, parsed.plain_text
+
+            print('Extracting fields with regex...')
+            regex_fields = extract_fields_from_markdown_advanced(doc_markdown)
+            # Not the plain text fallback: it may be down to a passing failure
+            if parsed and parsed.markdown is not None:
+                await asyncio.to_thread(parse_cache.put, content, {
+                    "markdown": doc_markdown, "links": links, "plain_text": plain_text, "fields": regex_fields,
+                    "path": parsed.path
+                })
         
         # If we still don't have enough information, prompt for manual input
         if not (regex_fields.get('skills') or regex_fields.get('experience') or regex_fields.get('education')):
@@ -675,12 +781,17 @@ async def match_resume(
             )
         
         # Get job listings
-        job_listings = json.loads(jobs) if jobs else fetch_job_listings(db)
+        job_listings, job_matrix, job_index, catalog_version = await request_jobs(jobs)
         print(f'Found {len(job_listings)} jobs')
         
-        # Match jobs
-        sorted_jobs = match_and_sort_jobs(resume_skills, job_listings, resume_experience, resume_education)
-        normalized_matches = [normalize_job(job, idx) for idx, job in enumerate(sorted_jobs)]
+        # Match jobs (only the requested page is built and normalized), off the event loop: scoring, or
+        # waiting on the sharded match workers, takes long enough on large catalogs to stall other requests
+        sorted_jobs = await asyncio.to_thread(
+            match_and_sort_jobs,
+            resume_skills, job_listings, resume_experience, resume_education, job_matrix=job_matrix,
+            limit=limit, offset=offset, tfidf_index=job_index, resume_text=plain_text or doc_markdown
+        )
+        normalized_matches = [normalize_job(job, idx) for idx, job in enumerate(sorted_jobs, start=offset)]
         
         # If using LLM, enhance with reasoning
         if use_llm and normalized_matches:
@@ -713,7 +824,10 @@ async def match_resume(
             matches=normalized_matches, 
             resume_data=resume_data, 
             fallback=not use_llm, 
-            error=None
+            error=None,
+            total=len(job_listings),
+            next_offset=next_page_offset(offset, normalized_matches, len(job_listings)),
+            catalog_version=catalog_version
         )
         
     except Exception as e:
@@ -726,23 +840,17 @@ async def match_resume(
             fallback=True, 
             error=f"Error processing resume: {str(e)}"
         )
-    finally:
-        # Clean up temp file
-        try:
-            os.remove(tmp_path)
-            print(f'Removed temp file: {tmp_path}')
-        except Exception as e:
-            print(f'Error removing temp file: {e}')
 
 @app.post("/test-docling")
 async def test_docling(resume: UploadFile = File(...)):
     import traceback
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(resume.filename)[-1]) as tmp:
-            tmp.write(await resume.read())
-            tmp_path = tmp.name
-        print(f"[Docling Test] Saved file to {tmp_path}")
-        doc_markdown, links, plain_text = parse_resume(tmp_path)
+        content = await resume.read()
+        print(f"[Docling Test] Parsing {resume.filename} ({len(content)} bytes)")
+        # Always through Docling: this endpoint is for checking its conversion
+        doc_markdown, links, plain_text, _, _ = await parse_pool.parse(content, resume.filename, high_fidelity=True)
+        if doc_markdown is None:
+            raise RuntimeError("Docling could not convert the document")
         print(f"[Docling Test] Markdown preview:\n{doc_markdown[:500]}")
         response = {
             "success": True,
@@ -751,14 +859,11 @@ async def test_docling(resume: UploadFile = File(...)):
             "plain_text": plain_text[:1000]  # preview only first 1000 chars
         }
         return response
+    except ParseQueueFull as e:
+        return parsing_busy(e)
     except Exception as e:
         print(f"[Docling Test] Error: {e}\n{traceback.format_exc()}")
         return {"success": False, "error": str(e)}
-    finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass 
 
 @app.post("/register")
 async def register(request: Request):
@@ -795,14 +900,13 @@ async def register(request: Request):
             email_verified = False
             phone_verified = False
         # For local testing: always allow registration, even if email exists
-        user_ref = db.collection('users').document(uid if uid else None)
-        user_doc = {"uid": uid if uid else user_ref.id, "email": email, "role": role}
-        print("DEBUG: Writing user_doc to Firestore:", user_doc)
-        user_ref.set(user_doc)  # Overwrites if exists
+        user_id = uid if uid else repo.new_id('users')
+        user_doc = {"uid": user_id, "email": email, "role": role}
+        print("DEBUG: Writing user_doc:", user_doc)
+        await repo.set_user(user_id, user_doc)  # Overwrites if exists
         recruiterId = None
         if role == "recruiter":
-            recruiter_ref = db.collection('recruiters').document()
-            recruiterId = recruiter_ref.id
+            recruiterId = repo.new_id('recruiters')
             recruiter_doc = {
                 "userId": uid,
                 "fullName": fullName,
@@ -815,14 +919,14 @@ async def register(request: Request):
                 "isPro": False,
                 "verificationStatus": "verified"
             }
-            print("DEBUG: Writing recruiter_doc to Firestore:", recruiter_doc)
-            recruiter_ref.set(recruiter_doc)
-            user_ref.set({"role": "recruiter", "recruiterId": recruiterId}, merge=True)
+            print("DEBUG: Writing recruiter_doc:", recruiter_doc)
+            await repo.set_recruiter(recruiterId, recruiter_doc)
+            await repo.set_user(user_id, {"role": "recruiter", "recruiterId": recruiterId}, merge=True)
             # If not both verified, return a message
             if not (email_verified and phone_verified):
                 return JSONResponse({"success": False, "error": "Recruiter must verify both email and phone number before approval.", "verificationStatus": "pending"})
         print("DEBUG: Registration complete for UID:", uid, "RecruiterId:", recruiterId)
-        return JSONResponse({"success": True, "uid": uid if uid else user_ref.id, "recruiterId": recruiterId})
+        return JSONResponse({"success": True, "uid": user_id, "recruiterId": recruiterId})
     except Exception as e:
         print("DEBUG: Exception in /register:", e)
         # For local testing: ignore duplicate email errors and always return success
@@ -833,10 +937,10 @@ async def register(request: Request):
 @app.get("/recruiter/profile")
 async def get_recruiter_profile(recruiterId: str = Query(...)):
     try:
-        doc = db.collection('recruiters').document(recruiterId).get()
-        if not doc.exists:
+        profile = await repo.get_recruiter(recruiterId)
+        if profile is None:
             return JSONResponse({"success": False, "error": "Recruiter not found"})
-        return JSONResponse({"success": True, "profile": doc.to_dict()})
+        return JSONResponse({"success": True, "profile": profile})
     except Exception as e:
         return JSONResponse({"success": False, "error": str(e)})
 
@@ -844,7 +948,7 @@ async def get_recruiter_profile(recruiterId: str = Query(...)):
 async def update_recruiter_profile(recruiterId: str = Query(...), request: Request = None):
     try:
         data = await request.json()
-        db.collection('recruiters').document(recruiterId).update(data)
+        await repo.update_recruiter(recruiterId, data)
         return JSONResponse({"success": True})
     except Exception as e:
         return JSONResponse({"success": False, "error": str(e)})
@@ -853,9 +957,9 @@ async def update_recruiter_profile(recruiterId: str = Query(...), request: Reque
 async def create_job(request: Request):
     data = await request.json()
     recruiterId = data.get("recruiterId")
-    job_ref = db.collection('jobs').document()
+    job_id = repo.new_id('jobs')
     job_doc = {
-        "job_id": job_ref.id,  # Use job_id for consistency
+        "job_id": job_id,  # Use job_id for consistency
         "recruiterId": recruiterId,  # Always use recruiterId
         "company": data.get("company"),
         "title": data.get("title"),
@@ -867,22 +971,38 @@ async def create_job(request: Request):
         "location": data.get("location"),
         "link": data.get("link", ""),
     }
-    job_ref.set(job_doc)
+    # Match features derived once here instead of on every match request
+    job_doc[FEATURES_FIELD] = compute_features(job_doc)
+    await repo.set_job(job_id, job_doc)
     return {"success": True, "job": job_doc}
 
+# Fields returned by list views; job documents also carry match_features and the applicants array
+JOB_LIST_FIELDS = [
+    "job_id", "recruiterId", "company", "title", "skills", "skills_required", "description",
+    "employment", "employment_type", "location", "link",
+]
+APPLICANT_LIST_FIELDS = ["id", "jobId", "candidateUid", "recruiterId", "status", "name", "email"]
+MESSAGE_FIELDS = ["id", "jobId", "recruiterId", "applicantId", "sender", "content", "timestamp"]
+
 @app.get("/recruiter/jobs")
-async def get_jobs(recruiterId: str):
+async def get_jobs(
+    recruiterId: str,
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    start_after: Optional[str] = Query(None)
+):
     try:
-        # Get jobs where recruiterId matches
-        jobs_ref = db.collection('jobs').where('recruiterId', '==', recruiterId)
+        # Get jobs where recruiterId matches, one page at a time when page_size is set
+        page = await repo.list_jobs(recruiterId, page_size=page_size, start_after=start_after, fields=JOB_LIST_FIELDS)
         jobs = [{
-            **job.to_dict(),
-            'id': job.id,  # Include the document ID
+            **job,
+            'id': job_id,  # Include the document ID
             'recruiterId': job.get('recruiterId'),  # Ensure consistent field name
-            'job_id': job.id  # For backward compatibility
-        } for job in jobs_ref.stream()]
+            'job_id': job_id  # For backward compatibility
+        } for job_id, job in page.items]
         
-        return {"success": True, "jobs": jobs}
+        return {"success": True, "jobs": jobs, "next_start_after": page.next_start_after}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"Error fetching jobs: {str(e)}")
         raise HTTPException(
@@ -890,12 +1010,32 @@ async def get_jobs(recruiterId: str):
             detail=f"Failed to fetch jobs: {str(e)}"
         )
 
+@app.get("/recruiter/applicant-summary")
+async def get_applicant_summary(recruiterId: str = Query(...)):
+    try:
+        # Applicant totals and status breakdown per job, from the per-job counters
+        return {"success": True, "jobs": await repo.applicant_summary(recruiterId)}
+    except Exception as e:
+        print(f"Error fetching applicant summary: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch applicant summary: {str(e)}"
+        )
+
 @app.get("/job/applicants")
-async def list_applicants(jobId: str = Query(...)):
+async def list_applicants(
+    jobId: str = Query(...),
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    start_after: Optional[str] = Query(None)
+):
     try:
-        applicants = db.collection('applicants').where('jobId', '==', jobId).stream()
-        applicant_list = [doc.to_dict() for doc in applicants]
-        return JSONResponse({"success": True, "applicants": applicant_list})
+        page = await repo.list_applicants(jobId, page_size=page_size, start_after=start_after, fields=APPLICANT_LIST_FIELDS)
+        applicant_list = [applicant for _, applicant in page.items]
+        return JSONResponse({
+            "success": True,
+            "applicants": applicant_list,
+            "next_start_after": page.next_start_after
+        })
     except Exception as e:
         return JSONResponse({"success": False, "error": str(e)}) 
 
@@ -909,13 +1049,13 @@ async def send_message(request: Request):
     content = data.get("content")
     try:
         # Check recruiter isPro
-        recruiter_doc = db.collection('recruiters').document(recruiterId).get()
-        if not recruiter_doc.exists or not recruiter_doc.to_dict().get('isPro'):
+        recruiter = await repo.get_recruiter(recruiterId)
+        if recruiter is None or not recruiter.get('isPro'):
             return JSONResponse({"success": False, "error": "Messaging is only available for Pro recruiters."})
         # Store message
-        msg_ref = db.collection('messages').document()
+        msg_id = repo.new_id('messages')
         msg_doc = {
-            "id": msg_ref.id,
+            "id": msg_id,
             "jobId": jobId,
             "recruiterId": recruiterId,
             "applicantId": applicantId,
@@ -923,25 +1063,62 @@ async def send_message(request: Request):
             "content": content,
             "timestamp": datetime.utcnow().isoformat()
         }
-        msg_ref.set(msg_doc)
-        return JSONResponse({"success": True, "messageId": msg_ref.id})
+        await repo.add_message(msg_id, msg_doc)
+        return JSONResponse({"success": True, "messageId": msg_id})
     except Exception as e:
         return JSONResponse({"success": False, "error": str(e)})
 
 @app.get("/messages")
-async def get_messages(jobId: str = Query(...), recruiterId: str = Query(...), applicantId: str = Query(...)):
+async def get_messages(
+    jobId: str = Query(...),
+    recruiterId: str = Query(...),
+    applicantId: str = Query(...),
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    start_after: Optional[str] = Query(None)
+):
     try:
-        msgs = db.collection('messages') \
-            .where('jobId', '==', jobId) \
-            .where('recruiterId', '==', recruiterId) \
-            .where('applicantId', '==', applicantId) \
-            .order_by('timestamp') \
-            .stream()
-        msg_list = [doc.to_dict() for doc in msgs]
-        return JSONResponse({"success": True, "messages": msg_list})
+        page = await repo.list_messages(
+            jobId, recruiterId, applicantId, page_size=page_size, start_after=start_after, fields=MESSAGE_FIELDS
+        )
+        msg_list = [msg for _, msg in page.items]
+        return JSONResponse({
+            "success": True,
+            "messages": msg_list,
+            "next_start_after": page.next_start_after
+        })
     except Exception as e:
         return JSONResponse({"success": False, "error": str(e)}) 
 
+# Bulk sends to at least this many applicants run in the background and return a job handle
+BULK_MESSAGE_JOB_MIN = 1000
+# Failures kept on a bulk message job document (Firestore documents are limited to 1 MiB)
+BULK_MESSAGE_MAX_FAILURES = 500
+# Background bulk sends of this process, referenced until they finish
+bulk_message_tasks = set()
+
+def bulk_message_results(msg_ids, applicantIds, errors):
+    sent = [msg_id for msg_id, error in zip(msg_ids, errors) if error is None]
+    failed = [
+        {"applicantId": applicantId, "error": str(error)}
+        for applicantId, error in zip(applicantIds, errors) if error is not None
+    ]
+    return sent, failed
+
+async def run_bulk_message_job(bulk_id, msg_ids, applicantIds, messages):
+    try:
+        errors = await repo.add_messages(messages)
+        sent, failed = bulk_message_results(msg_ids, applicantIds, errors)
+        await repo.set_bulk_message_job(bulk_id, {
+            "status": "done",
+            "sent": len(sent),
+            "failedCount": len(failed),
+            "failed": failed[:BULK_MESSAGE_MAX_FAILURES],
+            "finished_at": datetime.utcnow().isoformat()
+        }, merge=True)
+    except Exception as e:
+        print(f"Error in bulk message job {bulk_id}: {str(e)}")
+        await repo.set_bulk_message_job(bulk_id, {"status": "failed", "error": str(e), "finished_at": datetime.utcnow().isoformat()}, merge=True)
+
 @app.post("/messages/bulk")
 async def send_bulk_messages(request: Request):
     data = await request.json()
@@ -951,24 +1128,48 @@ async def send_bulk_messages(request: Request):
     template = data.get("template")
     try:
         # Check recruiter isPro
-        recruiter_doc = db.collection('recruiters').document(recruiterId).get()
-        if not recruiter_doc.exists or not recruiter_doc.to_dict().get('isPro'):
+        recruiter = await repo.get_recruiter(recruiterId)
+        if recruiter is None or not recruiter.get('isPro'):
             return JSONResponse({"success": False, "error": "Bulk messaging is only available for Pro recruiters."})
-        sent = []
-        for applicantId in applicantIds:
-            msg_ref = db.collection('messages').document()
-            msg_doc = {
-                "id": msg_ref.id,
+        # Message IDs are assigned locally; the backend writes them in batches
+        timestamp = datetime.utcnow().isoformat()
+        msg_ids = [repo.new_id('messages') for _ in applicantIds]
+        messages = [(msg_id, {
+            "id": msg_id,
+            "jobId": jobId,
+            "recruiterId": recruiterId,
+            "applicantId": applicantId,
+            "sender": "recruiter",
+            "content": template,
+            "timestamp": timestamp
+        }) for msg_id, applicantId in zip(msg_ids, applicantIds)]
+        if len(messages) >= BULK_MESSAGE_JOB_MIN:
+            bulk_id = repo.new_id('bulkMessageJobs')
+            await repo.set_bulk_message_job(bulk_id, {
+                "id": bulk_id,
                 "jobId": jobId,
                 "recruiterId": recruiterId,
-                "applicantId": applicantId,
-                "sender": "recruiter",
-                "content": template,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            msg_ref.set(msg_doc)
-            sent.append(msg_ref.id)
-        return JSONResponse({"success": True, "sent": sent})
+                "total": len(messages),
+                "status": "running",
+                "created_at": timestamp
+            })
+            task = asyncio.create_task(run_bulk_message_job(bulk_id, msg_ids, applicantIds, messages))
+            bulk_message_tasks.add(task)
+            task.add_done_callback(bulk_message_tasks.discard)
+            return JSONResponse({"success": True, "bulkJobId": bulk_id, "status": "running", "total": len(messages)})
+        errors = await repo.add_messages(messages)
+        sent, failed = bulk_message_results(msg_ids, applicantIds, errors)
+        return JSONResponse({"success": not failed, "sent": sent, "failed": failed})
+    except Exception as e:
+        return JSONResponse({"success": False, "error": str(e)})
+
+@app.get("/messages/bulk/{bulkJobId}")
+async def get_bulk_message_job(bulkJobId: str, recruiterId: str = Query(...)):
+    try:
+        bulk_job = await repo.get_bulk_message_job(bulkJobId)
+        if bulk_job is None or bulk_job.get('recruiterId') != recruiterId:
+            return JSONResponse({"success": False, "error": "Bulk message job not found"})
+        return JSONResponse({"success": True, "job": bulk_job})
     except Exception as e:
         return JSONResponse({"success": False, "error": str(e)})
 
@@ -978,10 +1179,9 @@ async def update_applicant_status(request: Request):
     applicantId = data.get("applicantId")
     status = data.get("status")
     try:
-        applicant_ref = db.collection('applicants').document(applicantId)
-        if not applicant_ref.get().exists:
+        # The status and the job's per-status counters change in one transaction
+        if not await repo.set_applicant_status(applicantId, status):
             return JSONResponse({"success": False, "error": "Applicant not found"})
-        applicant_ref.update({"status": status})
         return JSONResponse({"success": True})
     except Exception as e:
         return JSONResponse({"success": False, "error": str(e)}) 
@@ -1014,8 +1214,7 @@ async def apply_to_job(
             content = await resume.read()
             buffer.write(content)
         
-        # Store application in Firestore
-        db = firestore.client()
+        # Store the application
         app_id = str(uuid.uuid4())
         
         application_data = {
@@ -1029,24 +1228,8 @@ async def apply_to_job(
             "notes": ""
         }
         
-        # Add to applications collection
-        db.collection("applications").document(app_id).set(application_data)
-        
-        # Also add reference to the job's applicants
-        job_ref = db.collection("jobs").document(jobId)
-        job_ref.update({
-            "applicants": firestore.ArrayUnion([candidateUid])
-        })
-        
-        # Add reference to user's applications
-        user_ref = db.collection("users").document(candidateUid)
-        user_ref.update({
-            "applications": firestore.ArrayUnion([{
-                "job_id": jobId,
-                "status": "applied",
-                "applied_at": datetime.utcnow().isoformat()
-            }])
-        })
+        # With the job's applicants entry, the user's applications and the job's counters, atomically
+        await repo.add_application(app_id, application_data)
         
         return {"success": True, "message": "Application submitted successfully"}
         
@@ -1058,30 +1241,38 @@ async def apply_to_job(
         )
 
 @app.get("/job/applicants/{job_id}")
-async def get_job_applicants(job_id: str, recruiter_id: str = Query(...)):
+async def get_job_applicants(
+    job_id: str,
+    recruiter_id: str = Query(...),
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    start_after: Optional[str] = Query(None)
+):
     try:
-        db = firestore.client()
-        
         # First verify the recruiter owns this job
-        job_doc = db.collection("jobs").document(job_id).get()
-        if not job_doc.exists or job_doc.to_dict().get("recruiter_id") != recruiter_id:
+        job = await repo.get_job(job_id)
+        if job is None or job.get("recruiter_id") != recruiter_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view these applications"
             )
         
-        # Get all applications for this job
-        applications = db.collection("applications").where("job_id", "==", job_id).stream()
+        # Applications for this job in document ID order; page_size / start_after page through them
+        page = await repo.list_applications(
+            job_id, page_size=page_size, start_after=start_after,
+            fields=["candidate_uid", "resume_url", "status", "applied_at", "notes"]
+        )
         
-        # Get user details for each applicant
+        # User details for every applicant in bulk, joined in memory
+        users = await repo.get_users(
+            (app_data["candidate_uid"] for _, app_data in page.items),
+            fields=["displayName", "email"]
+        )
         applicants = []
-        for app in applications:
-            app_data = app.to_dict()
-            user_doc = db.collection("users").document(app_data["candidate_uid"]).get()
-            if user_doc.exists:
-                user_data = user_doc.to_dict()
+        for app_id, app_data in page.items:
+            user_data = users.get(app_data["candidate_uid"])
+            if user_data is not None:
                 applicants.append({
-                    "application_id": app.id,
+                    "application_id": app_id,
                     "candidate_uid": app_data["candidate_uid"],
                     "name": user_data.get("displayName", ""),
                     "email": user_data.get("email", ""),
@@ -1091,8 +1282,10 @@ async def get_job_applicants(job_id: str, recruiter_id: str = Query(...)):
                     "notes": app_data.get("notes", "")
                 })
         
-        return {"success": True, "applicants": applicants}
+        return {"success": True, "applicants": applicants, "next_start_after": page.next_start_after}
         
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"Error in get_job_applicants: {str(e)}")
         raise HTTPException(
@@ -1108,25 +1301,24 @@ async def apply_to_job(request: Request):
     recruiterId = data.get("recruiterId")
     if not jobId or not candidateUid or not recruiterId:
         return {"success": False, "error": "Missing jobId, candidateUid, or recruiterId"}
-    app_ref = db.collection('applicants').document()
+    applicant_id = repo.new_id('applicants')
     app_doc = {
-        "id": app_ref.id,
+        "id": applicant_id,
         "jobId": jobId,
         "candidateUid": candidateUid,
         "recruiterId": recruiterId,
         "status": "Applied"
     }
-    app_ref.set(app_doc)
+    await repo.add_applicant(applicant_id, app_doc)
     return {"success": True, "application": app_doc}
 
 @app.get("/user-info")
 async def user_info(uid: str = None):
     if not uid:
         return {"success": False, "error": "Missing uid"}
-    user_doc = db.collection('users').document(uid).get()
-    if not user_doc.exists:
+    user_data = await repo.get_user(uid)
+    if user_data is None:
         return {"success": False, "error": "User not found"}
-    user_data = user_doc.to_dict()
     role = user_data.get('role', 'candidate')
     recruiterId = user_data.get('recruiterId') if role == 'recruiter' else None
     return {"success": True, "role": role, "recruiterId": recruiterId} 
@@ -1146,18 +1338,15 @@ async def update_application_status(request: Request):
                 detail="Missing required fields"
             )
         
-        db = firestore.client()
-        app_ref = db.collection("applications").document(application_id)
-        app_data = app_ref.get()
+        app_dict = await repo.get_application(application_id)
         
-        if not app_data.exists:
+        if app_dict is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Application not found"
             )
         
         # Verify the recruiter has access to this application
-        app_dict = app_data.to_dict()
         if app_dict.get("recruiter_id") != recruiter_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -1171,25 +1360,12 @@ async def update_application_status(request: Request):
         
         if new_status:
             update_data["status"] = new_status
-            
-            # Also update the status in the user's applications array
-            user_ref = db.collection("users").document(app_dict["candidate_uid"])
-            user_data = user_ref.get().to_dict()
-            
-            if user_data and "applications" in user_data:
-                updated_apps = [
-                    {**app, "status": new_status} 
-                    if app.get("job_id") == app_dict["job_id"] 
-                    else app 
-                    for app in user_data["applications"]
-                ]
-                user_ref.update({"applications": updated_apps})
         
         if notes is not None:
             update_data["notes"] = notes
         
-        # Update the application
-        app_ref.update(update_data)
+        # A status change also updates the user's copy of it and the job's per-status counters, in one transaction
+        await repo.update_application(application_id, app_dict, update_data)
         
         return {"success": True, "message": "Application updated successfully"}
         
@@ -0,0 +1,50 @@
+"""
+recall@k and latency of approximate (IVF) vs exact matching.
+
+    python benchmarks/ann_recall.py --jobs 200000 --candidates 2000 --k 20
+"""
+import argparse
+import statistics
+import time
+
+from synthetic import make_jobs, make_resume, role_profiles
+
+from utils.ann import recall_at_k
+from utils.job_matching import ResumeProfile
+from utils.matching_engine import JobMatrix
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=200000)
+    parser.add_argument('--candidates', type=int, default=2000)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    roles = role_profiles()
+    start = time.perf_counter()
+    matrix = JobMatrix(make_jobs(args.jobs, roles=roles))
+    print(f"catalog build: {time.perf_counter() - start:.2f}s for {args.jobs} jobs")
+    start = time.perf_counter()
+    matrix.build_ann()
+    print(f"IVF build: {time.perf_counter() - start:.2f}s, {matrix.ann.n_lists} lists")
+
+    recalls, exact_times, approx_times = [], [], []
+    for seed in range(args.queries):
+        profile = ResumeProfile(*make_resume(seed, roles))
+        start = time.perf_counter()
+        matrix.match_and_sort(profile, limit=args.k, mode='exact')
+        exact_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        matrix.match_and_sort(profile, limit=args.k, mode='approximate', n_candidates=args.candidates)
+        approx_times.append(time.perf_counter() - start)
+        recalls.append(recall_at_k(matrix, profile, args.k, args.candidates))
+
+    print(f"recall@{args.k}: mean {statistics.mean(recalls):.3f}, min {min(recalls):.3f}")
+    print(f"exact:       median {statistics.median(exact_times) * 1000:.1f} ms")
+    print(f"approximate: median {statistics.median(approx_times) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
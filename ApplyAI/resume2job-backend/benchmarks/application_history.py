@@ -0,0 +1,58 @@
+"""
+Cost of one /job/update-status against the candidate's application history:
+rewriting the users.applications array vs the targeted write to
+users/{uid}/applications/{job_id}.
+
+    python benchmarks/application_history.py --lengths 1 10 100 1000 5000
+
+Payloads are JSON-encoded as a stand-in for the wire format; bytes are what
+the status change reads plus writes for the user's application state, time
+is the decode / rewrite / encode work per update on this process.
+"""
+import argparse
+import json
+import time
+
+
+def history(length):
+    return [{"job_id": f"job-{i:06d}", "status": "applied", "applied_at": "2024-01-01T00:00:00"} for i in range(length)]
+
+
+def array_update(stored, job_id, new_status):
+    """Read the user document, rewrite the whole array, write it back."""
+    user_data = json.loads(stored)
+    updated_apps = [{**app, "status": new_status} if app.get("job_id") == job_id else app for app in user_data["applications"]]
+    written = json.dumps({"applications": updated_apps})
+    return len(stored) + len(written), written
+
+
+def keyed_update(job_id, new_status):
+    """No read; one merged write to the job's own document."""
+    written = json.dumps({"job_id": job_id, "status": new_status})
+    return len(written), written
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lengths', type=int, nargs='+', default=[1, 10, 100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'array bytes':>12} {'array us':>10} {'keyed bytes':>12} {'keyed us':>10}")
+    for length in args.lengths:
+        stored = json.dumps({"displayName": "Candidate", "applications": history(length)})
+        job_id = f"job-{length // 2:06d}"
+        array_time, (array_bytes, _) = timed(lambda: array_update(stored, job_id, "interview"), args.repeat)
+        keyed_time, (keyed_bytes, _) = timed(lambda: keyed_update(job_id, "interview"), args.repeat)
+        print(f"{length:>8} {array_bytes:>12} {array_time * 1e6:>10.1f} {keyed_bytes:>12} {keyed_time * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
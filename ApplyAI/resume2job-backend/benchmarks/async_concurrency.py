@@ -0,0 +1,126 @@
+"""
+Tail latency of concurrent requests against a simulated slow Firestore,
+calling the sync client inside async handlers vs awaiting AsyncFirestore.
+
+    python benchmarks/async_concurrency.py --requests 400 --rate 200
+
+Requests arrive on a fixed schedule (open loop) and latency is measured from
+the scheduled arrival, so time spent waiting on a blocked event loop counts.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import synthetic  # noqa: F401  (puts the backend on sys.path)
+
+from utils.async_firestore import AsyncFirestore
+
+
+class SlowSnapshot:
+    exists = True
+
+    def __init__(self, doc_id):
+        self.id = doc_id
+
+    def to_dict(self):
+        return {"id": self.id}
+
+
+class SlowDocument:
+    def __init__(self, latency, doc_id):
+        self.latency = latency
+        self.id = doc_id
+
+    def get(self):
+        time.sleep(self.latency)
+        return SlowSnapshot(self.id)
+
+
+class SlowQuery:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def where(self, *args):
+        return self
+
+    def stream(self):
+        time.sleep(self.latency)
+        return iter([SlowSnapshot(str(i)) for i in range(20)])
+
+
+class SlowCollection(SlowQuery):
+    def __init__(self, get_latency, query_latency):
+        super().__init__(query_latency)
+        self.get_latency = get_latency
+
+    def document(self, doc_id=None):
+        return SlowDocument(self.get_latency, doc_id)
+
+
+class SlowFirestore:
+    """Point reads take get_latency seconds, queries (e.g. /job/applicants) query_latency."""
+
+    def __init__(self, get_latency, query_latency):
+        self.get_latency = get_latency
+        self.query_latency = query_latency
+
+    def collection(self, name):
+        return SlowCollection(self.get_latency, self.query_latency)
+
+
+async def blocking_handler(db, slow):
+    if slow:
+        return [doc.to_dict() for doc in db.collection("applicants").where("jobId", "==", "j").stream()]
+    return db.collection("users").document("u").get().to_dict()
+
+
+async def async_handler(store, slow):
+    if slow:
+        return [doc.to_dict() for doc in await store.stream(store.collection("applicants").where("jobId", "==", "j"))]
+    return (await store.get(store.document("users", "u"))).to_dict()
+
+
+async def run(handler, backend, kinds, rate):
+    latencies = {False: [], True: []}
+    start = time.perf_counter()
+
+    async def one(i, slow):
+        arrival = start + i / rate
+        await asyncio.sleep(max(arrival - time.perf_counter(), 0))
+        await handler(backend, slow)
+        latencies[slow].append(time.perf_counter() - arrival)
+
+    await asyncio.gather(*(one(i, slow) for i, slow in enumerate(kinds)))
+    return latencies, time.perf_counter() - start
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--rate', type=float, default=200, help='Requests per second')
+    parser.add_argument('--slow-share', type=float, default=0.05)
+    parser.add_argument('--get-ms', type=float, default=10)
+    parser.add_argument('--query-ms', type=float, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    kinds = [rng.random() < args.slow_share for _ in range(args.requests)]
+    db = SlowFirestore(args.get_ms / 1000, args.query_ms / 1000)
+    store = AsyncFirestore(db)
+    print(f"{args.requests} requests at {args.rate:.0f}/s, {sum(kinds)} slow queries of {args.query_ms:.0f} ms")
+    for name, handler, backend in (('sync client in async def', blocking_handler, db), ('AsyncFirestore', async_handler, store)):
+        latencies, wall = asyncio.run(run(handler, backend, kinds, args.rate))
+        fast = [t * 1000 for t in latencies[False]]
+        print(f"{name:>26}: fast reads p50 {percentile(fast, 50):7.1f} ms  p99 {percentile(fast, 99):7.1f} ms  "
+              f"max {max(fast):7.1f} ms  wall {wall:5.2f} s")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
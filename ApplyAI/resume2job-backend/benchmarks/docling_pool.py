@@ -0,0 +1,74 @@
+"""
+Per-document Docling latency with a new converter per upload (cold, as
+parse_resume used to do) vs a converter reused from the warm pool.
+
+    python benchmarks/docling_pool.py [--pdf resume.pdf] --documents 10
+
+Without --pdf a two-page resume is generated with PyMuPDF.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import synthetic  # noqa: F401  (puts the backend on sys.path)
+
+from utils.converter_pool import ConverterPool
+from utils.docling_utils import new_converter
+
+SAMPLE_LINES = [
+    "Jane Doe", "jane.doe@example.com | +1 555 0100 | github.com/janedoe", "",
+    "SKILLS", "Python, FastAPI, PostgreSQL, Docker, Kubernetes, React, TypeScript, AWS", "",
+    "EXPERIENCE", "Senior Backend Engineer, Acme Corp, 2020 - present",
+    "Built event-driven services handling 20k requests per second.", "",
+    "Software Engineer, Initech, 2016 - 2020", "Maintained data pipelines and internal APIs.", "",
+    "EDUCATION", "B.Sc. Computer Science, State University, 2012 - 2016",
+]
+
+
+def sample_pdf(path, pages=2):
+    import fitz
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), "\n".join(SAMPLE_LINES), fontsize=11)
+    doc.save(path)
+    return path
+
+
+def summary(samples):
+    return f"mean {statistics.mean(samples):7.2f} s  p50 {statistics.median(samples):7.2f} s  max {max(samples):7.2f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pdf')
+    parser.add_argument('--documents', type=int, default=10)
+    args = parser.parse_args()
+    pdf = args.pdf or sample_pdf(os.path.join(tempfile.mkdtemp(), "resume.pdf"))
+
+    cold = []
+    for _ in range(args.documents):
+        start = time.perf_counter()
+        new_converter().convert(pdf)
+        cold.append(time.perf_counter() - start)
+
+    pool = ConverterPool(new_converter, size=1)
+    start = time.perf_counter()
+    pool.warm()
+    warm_up = time.perf_counter() - start
+    warm = []
+    for _ in range(args.documents):
+        start = time.perf_counter()
+        with pool.converter() as converter:
+            converter.convert(pdf)
+        warm.append(time.perf_counter() - start)
+
+    print(f"{args.documents} conversions of {pdf}")
+    print(f"  cold (new converter each): {summary(cold)}")
+    print(f"  warm (pooled converter):   {summary(warm)}  after a one-off {warm_up:.2f} s warm-up")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Text layer quality and parse latency of the PyMuPDF fast path vs Docling,
+per PDF, with the path parse_resume picks at the current threshold.
+
+    python benchmarks/fast_path.py [--pdf a.pdf --pdf b.pdf ...] --repeats 3
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import synthetic  # noqa: F401  (puts the backend on sys.path)
+
+from docling_pool import sample_pdf
+from utils.docling_utils import FAST_PATH_MIN_QUALITY, converter_pool, parse_resume
+
+
+def timed(content, filename, high_fidelity, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = parse_resume(content, filename, high_fidelity)
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pdf', action='append')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    pdfs = args.pdf or [sample_pdf(os.path.join(tempfile.mkdtemp(), "resume.pdf"))]
+
+    converter_pool.warm()
+    print(f"FAST_PATH_MIN_QUALITY = {FAST_PATH_MIN_QUALITY}")
+    for pdf in pdfs:
+        with open(pdf, 'rb') as f:
+            content = f.read()
+        filename = os.path.basename(pdf)
+        default, default_seconds = timed(content, filename, False, args.repeats)
+        _, docling_seconds = timed(content, filename, True, args.repeats)
+        print(f"  {filename}: quality {default.quality:.3f} -> {default.path} path, "
+              f"p50 {default_seconds * 1000:8.1f} ms (Docling {docling_seconds * 1000:8.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
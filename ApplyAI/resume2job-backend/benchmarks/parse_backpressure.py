@@ -0,0 +1,84 @@
+"""
+A burst of concurrent resume uploads against the parse worker pool: how many
+are admitted or turned away with a Retry-After, how long admitted ones wait
+for a worker, and whether the event loop keeps ticking meanwhile (it stalled
+for the whole conversion when parse_resume ran inline in the route).
+
+    python benchmarks/parse_backpressure.py [--pdf resume.pdf] --uploads 20 --workers 2 --queue 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import synthetic  # noqa: F401  (puts the backend on sys.path)
+
+from docling_pool import sample_pdf
+from utils.parse_pool import ParsePool, ParseQueueFull
+
+
+async def ticker(interval, stalls, stop):
+    # Largest gap between ticks beyond the interval is the worst event loop stall
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        stalls.append(now - last - interval)
+        last = now
+
+
+async def upload(pool, content, outcomes):
+    start = time.perf_counter()
+    try:
+        await pool.parse(content, "resume.pdf")
+        outcomes.append(("parsed", time.perf_counter() - start, None))
+    except ParseQueueFull as e:
+        outcomes.append(("rejected", time.perf_counter() - start, e.retry_after))
+    except Exception as e:
+        outcomes.append(("failed", time.perf_counter() - start, str(e)))
+
+
+async def burst(pool, content, uploads):
+    stalls, outcomes, stop = [], [], asyncio.Event()
+    tick = asyncio.create_task(ticker(0.01, stalls, stop))
+    await asyncio.gather(*[upload(pool, content, outcomes) for _ in range(uploads)])
+    stop.set()
+    await tick
+    return outcomes, stalls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pdf')
+    parser.add_argument('--uploads', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--queue', type=int, default=4)
+    args = parser.parse_args()
+    pdf = args.pdf or sample_pdf(os.path.join(tempfile.mkdtemp(), "resume.pdf"))
+    with open(pdf, 'rb') as f:
+        content = f.read()
+
+    pool = ParsePool(workers=args.workers, max_queue=args.queue)
+    start = time.perf_counter()
+    pool.warm()
+    print(f"{args.workers} parse workers warm after {time.perf_counter() - start:.2f} s")
+    try:
+        outcomes, stalls = asyncio.run(burst(pool, content, args.uploads))
+    finally:
+        metrics = pool.metrics()
+        pool.close()
+
+    for kind in ("parsed", "rejected", "failed"):
+        seconds = [elapsed for outcome, elapsed, _ in outcomes if outcome == kind]
+        if seconds:
+            print(f"  {kind:>8}: {len(seconds):4d}  slowest response {max(seconds):6.2f} s")
+    retry_after = sorted({detail for outcome, _, detail in outcomes if outcome == "rejected"})
+    if retry_after:
+        print(f"  Retry-After given: {retry_after} s")
+    print(f"  queue wait: {metrics['wait_seconds']}  parse: {metrics['parse_seconds']}")
+    print(f"  worst event loop stall: {max(stalls, default=0) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Cost of a repeat upload with and without the parsed resume cache: a full
+Docling + PyMuPDF parse and regex field extraction vs a memory or disk hit.
+
+    python benchmarks/parse_cache.py [--pdf resume.pdf] --repeats 5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import synthetic  # noqa: F401  (puts the backend on sys.path)
+
+from docling_pool import sample_pdf, summary
+from utils.docling_utils import converter_pool, parse_resume
+from utils.parse_cache import ParseCache
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pdf')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    pdf = args.pdf or sample_pdf(os.path.join(tempfile.mkdtemp(), "resume.pdf"))
+    with open(pdf, 'rb') as f:
+        content = f.read()
+    # The route's field extraction lives in app.py; it needs spaCy and rapidfuzz
+    from app import extract_fields_from_markdown_advanced
+
+    converter_pool.warm()
+    parsed = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        markdown, links, plain_text, path, _ = parse_resume(content, os.path.basename(pdf))
+        fields = extract_fields_from_markdown_advanced(markdown)
+        parsed.append(time.perf_counter() - start)
+    entry = {"markdown": markdown, "links": links, "plain_text": plain_text, "fields": fields, "path": path}
+
+    directory = tempfile.mkdtemp()
+    ParseCache(directory=directory).put(content, entry)
+    disk, memory = [], []
+    for _ in range(args.repeats):
+        # A fresh cache has an empty LRU, as in another worker
+        cache = ParseCache(directory=directory)
+        start = time.perf_counter()
+        assert cache.get(content) == entry
+        disk.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        cache.get(content)
+        memory.append(time.perf_counter() - start)
+
+    print(f"{args.repeats} repeat uploads of {pdf} ({len(content) / 1024:.0f} KiB)")
+    print(f"  parse + extract: {summary(parsed)}  ({path} path)")
+    print(f"  disk hit:        mean {statistics.mean(disk) * 1000:7.2f} ms")
+    print(f"  memory hit:      mean {statistics.mean(memory) * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+PyMuPDF text and link extraction from an upload, the old way (bytes written
+to a temp file, then the file opened by path, once for the parse and once
+more for the fallback) vs straight from the bytes in memory, opened once.
+
+    python benchmarks/parse_from_memory.py [--pdf resume.pdf] --pages 2 --repeats 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import synthetic  # noqa: F401  (puts the backend on sys.path)
+
+from docling_pool import sample_pdf
+from utils.docling_utils import extract_text_and_links, pdf_text_and_links
+
+
+def via_temp_file(content, opens=2):
+    import fitz
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(content)
+        tmp_path = tmp.name
+    try:
+        for _ in range(opens):
+            with fitz.open(tmp_path) as doc:
+                result = extract_text_and_links(doc)
+        return result
+    finally:
+        os.remove(tmp_path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pdf')
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+    pdf = args.pdf or sample_pdf(os.path.join(tempfile.mkdtemp(), "resume.pdf"), pages=args.pages)
+    with open(pdf, 'rb') as f:
+        content = f.read()
+
+    timings = {"temp file, opened twice": [], "in memory, opened once": []}
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        via_temp_file(content)
+        timings["temp file, opened twice"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        pdf_text_and_links(content, pdf)
+        timings["in memory, opened once"].append(time.perf_counter() - start)
+
+    print(f"{args.repeats} extractions of {pdf} ({len(content) / 1024:.0f} KiB)")
+    for name, samples in timings.items():
+        print(f"  {name:>24}: mean {statistics.mean(samples) * 1000:7.2f} ms  p50 {statistics.median(samples) * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
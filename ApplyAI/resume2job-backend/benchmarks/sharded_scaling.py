@@ -0,0 +1,62 @@
+"""
+Sharded multi-process matching: latency across 1..N worker processes,
+checked against the in-process exact ranking.
+
+    python benchmarks/sharded_scaling.py --jobs 200000 --k 20 --max-workers 8
+"""
+import argparse
+import multiprocessing
+import statistics
+import time
+
+import numpy as np
+from synthetic import make_jobs, make_resume, role_profiles
+
+from utils.job_matching import ResumeProfile
+from utils.matching_engine import JobMatrix, top_k_rows
+from utils.sharded_matching import ShardedMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=200000)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=30)
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    roles = role_profiles()
+    matrix = JobMatrix(make_jobs(args.jobs, roles=roles))
+    profiles = [ResumeProfile(*make_resume(seed, roles)) for seed in range(args.queries)]
+
+    in_process = []
+    expected = []
+    for profile in profiles:
+        start = time.perf_counter()
+        scores = matrix.score(profile).compatibility
+        rows = top_k_rows(scores, args.k)
+        in_process.append(time.perf_counter() - start)
+        expected.append((rows.tolist(), scores[rows].tolist()))
+    baseline = statistics.median(in_process)
+    print(f"in-process full scan: median {baseline * 1000:.1f} ms")
+
+    for n_workers in range(1, args.max_workers + 1):
+        matcher = ShardedMatcher(n_workers)
+        try:
+            # Start the workers and attach the shared catalog outside the timings
+            matcher.rank(matrix, profiles[0], args.k)
+            times = []
+            for profile, (rows, compatibility) in zip(profiles, expected):
+                start = time.perf_counter()
+                result, _, scores = matcher.rank(matrix, profile, args.k)
+                times.append(time.perf_counter() - start)
+                assert result.tolist() == rows
+                assert np.array_equal(scores.compatibility, compatibility)
+        finally:
+            matcher.close()
+        latency = statistics.median(times)
+        print(f"{n_workers:2d} workers: median {latency * 1000:.1f} ms ({baseline / latency:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
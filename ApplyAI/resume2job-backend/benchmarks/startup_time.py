@@ -0,0 +1,97 @@
+"""
+Cold start of a worker: import cost of the heavy dependencies, of app.py,
+and time until /health answers and /ready reports warm.
+
+    python benchmarks/startup_time.py [--serve] [--backend sqlite]
+
+Every measurement runs in a fresh interpreter so nothing is cached in
+sys.modules. --serve starts uvicorn and polls the health endpoints; with the
+SQLite backend it needs no Firebase credentials.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    "docling.document_converter", "langchain.prompts", "langchain_google_genai", "spacy",
+    "sklearn.feature_extraction.text", "rapidfuzz", "scipy.sparse", "firebase_admin.firestore",
+]
+
+
+def import_seconds(module, env=None):
+    """Seconds to import module in a fresh interpreter, or None if it is not installed."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def poll(url, start, deadline):
+    """(seconds from start until url answered 200, its body), or (None, last body) at the deadline."""
+    body = None
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return time.perf_counter() - start, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            body = json.loads(e.read() or b"null")
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.05)
+    return None, body
+
+
+def serve(env, port, timeout):
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        health, _ = poll(f"http://127.0.0.1:{port}/health", start, deadline)
+        ready, body = poll(f"http://127.0.0.1:{port}/ready", start, deadline)
+        print(f"/health answered after {health:.2f} s" if health is not None else f"/health not answering after {timeout} s")
+        print(f"/ready reported warm after {ready:.2f} s" if ready is not None else f"/ready still not warm after {timeout} s")
+        if body:
+            for name, step in body["warmup"]["steps"].items():
+                print(f"  {name:>12}: {step['status']:<8} {step.get('seconds', 0):6.2f} s {step.get('error', '')}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', default='sqlite', choices=['sqlite', 'firestore'])
+    parser.add_argument('--serve', action='store_true', help='Also time /health and /ready under uvicorn')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    env = dict(os.environ, STORAGE_BACKEND=args.backend)
+    if args.backend == 'sqlite':
+        env["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "startup.db")
+
+    print("Import time in a fresh interpreter (now deferred from app import):")
+    for module in HEAVY_MODULES:
+        seconds = import_seconds(module)
+        print(f"  {module:>32}: " + (f"{seconds:6.2f} s" if seconds is not None else "not installed"))
+    seconds = import_seconds("app", env)
+    print(f"  {'app':>32}: " + (f"{seconds:6.2f} s" if seconds is not None else "failed to import"))
+
+    if args.serve:
+        serve(env, args.port, args.timeout)
+
+
+if __name__ == '__main__':
+    main()
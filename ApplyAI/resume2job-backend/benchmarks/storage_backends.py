@@ -0,0 +1,96 @@
+"""
+Latency of the repository calls behind the API routes on the SQLite backend.
+
+    python benchmarks/storage_backends.py --jobs 20000 --recruiters 200 --applications 100000
+
+Seeds a fresh database file (jobs spread over recruiters, applications over
+jobs, one long conversation) and times each query shape through the async
+interface the routes use, so pool hand-off is included.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from synthetic import make_jobs
+
+from utils.sqlite_repository import SqliteRepository
+
+
+async def seed(repo, args, rng):
+    jobs = make_jobs(args.jobs, seed=0)
+    for i, job in enumerate(jobs):
+        job["recruiterId"] = f"r{i % args.recruiters}"
+    for job in jobs:
+        await repo.set_job(job["job_id"], job)
+    for uid in range(args.users):
+        await repo.set_user(f"u{uid}", {"uid": f"u{uid}", "email": f"u{uid}@example.com", "displayName": f"User {uid}"})
+    for i in range(args.applications):
+        job = jobs[rng.randrange(len(jobs))]
+        await repo.add_application(f"a{i}", {
+            "id": f"a{i}", "job_id": job["job_id"], "candidate_uid": f"u{rng.randrange(args.users)}",
+            "recruiter_id": job["recruiterId"], "status": "applied", "applied_at": f"2024-01-01T00:00:{i % 60:02d}",
+        })
+    await repo.add_messages([(f"m{i}", {
+        "id": f"m{i}", "jobId": jobs[0]["job_id"], "recruiterId": "r0", "applicantId": "u0",
+        "sender": "recruiter", "content": "Hello", "timestamp": f"2024-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}",
+    }) for i in range(args.messages)])
+    return jobs
+
+
+async def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(args):
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    repo = SqliteRepository(path)
+    start = time.perf_counter()
+    jobs = await seed(repo, args, rng)
+    print(f"Seeded {args.jobs} jobs, {args.users} users, {args.applications} applications, "
+          f"{args.messages} messages in {time.perf_counter() - start:.1f} s ({path})")
+
+    job_ids = [job["job_id"] for job in jobs]
+    uids = [f"u{uid}" for uid in range(args.users)]
+    application = await repo.get_application("a0")
+    shapes = [
+        ("get user", lambda: repo.get_user(rng.choice(uids))),
+        ("get job", lambda: repo.get_job(rng.choice(job_ids))),
+        ("recruiter jobs page", lambda: repo.list_jobs(f"r{rng.randrange(args.recruiters)}", page_size=50)),
+        ("job applications page", lambda: repo.list_applications(rng.choice(job_ids), page_size=50)),
+        ("get 50 users", lambda: repo.get_users(rng.sample(uids, 50), fields=["displayName", "email"])),
+        ("conversation page", lambda: repo.list_messages(job_ids[0], "r0", "u0", page_size=50)),
+        ("applicant summary", lambda: repo.applicant_summary(f"r{rng.randrange(args.recruiters)}")),
+        ("status change", lambda: repo.update_application(
+            "a0", application, {"status": rng.choice(["applied", "interview"])})),
+    ]
+    for name, fn in shapes:
+        samples = await timed(fn, args.repeat)
+        q = statistics.quantiles(samples, n=100)
+        print(f"{name:>24}: p50 {q[49]:6.3f} ms  p99 {q[98]:6.3f} ms")
+    repo.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=20000)
+    parser.add_argument('--recruiters', type=int, default=200)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--applications', type=int, default=100000)
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Synthetic job catalogs and resumes for the benchmarks.
+
+Jobs are drawn from role profiles (each a pool of related skills and
+keywords) so that skill vectors cluster the way a real catalog does.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.skill_taxonomy import CANONICAL_SKILLS  # noqa: E402
+
+EXPERIENCE_KEYWORDS = [f"{area} {level}" for area in (
+    'backend', 'frontend', 'data', 'cloud', 'mobile', 'security', 'platform', 'ml', 'qa', 'devops',
+    'payments', 'search', 'infra', 'analytics', 'embedded', 'gaming', 'fintech', 'health', 'retail', 'ads',
+) for level in ('intern', 'junior', 'engineer', 'senior', 'lead', 'manager')]
+EDUCATION_KEYWORDS = ['bsc', 'msc', 'computer science', 'mathematics', 'engineering', 'phd', 'mba', 'physics', 'statistics']
+
+
+def role_profiles(n_roles=40, pool_size=15, seed=0):
+    """Per role: (skill pool, experience keyword pool)."""
+    rng = random.Random(seed)
+    # Random made-up skill names, dissimilar enough not to fuzzy-match each other
+    extra = {''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(10)) for _ in range(300)}
+    skills = list(CANONICAL_SKILLS) + sorted(extra)
+    return [(rng.sample(skills, pool_size), rng.sample(EXPERIENCE_KEYWORDS, 6)) for _ in range(n_roles)]
+
+
+def make_jobs(n_jobs, seed=0, roles=None):
+    rng = random.Random(seed)
+    roles = roles or role_profiles(seed=seed)
+    jobs = []
+    for i in range(n_jobs):
+        pool, experience_pool = rng.choice(roles)
+        jobs.append({
+            'job_id': f"job-{i}",
+            'title': f"Job {i}",
+            'company': f"Company {i % 500}",
+            'description': ' '.join(rng.sample(pool, 6) + rng.sample(experience_pool, 2)),
+            'skills': rng.sample(pool, rng.randint(3, 10)),
+            'experience': rng.sample(experience_pool, rng.randint(0, 3)),
+            'education': rng.sample(EDUCATION_KEYWORDS, rng.randint(0, 2)),
+            'recruiterId': f"recruiter-{i % 200}",
+        })
+    return jobs
+
+
+def make_resume(seed=0, roles=None):
+    """(skills, experience, education) for one synthetic candidate."""
+    rng = random.Random(seed)
+    roles = roles or role_profiles()
+    pool, experience_pool = rng.choice(roles)
+    skills = rng.sample(pool, rng.randint(4, 10)) + rng.sample(rng.choice(roles)[0], 2)
+    experience = [{'title': ' '.join(rng.sample(experience_pool, 3)), 'details': 'Built things.'}]
+    education = [{'degree': rng.choice(EDUCATION_KEYWORDS)}]
+    return skills, experience, education
@@ -0,0 +1,146 @@
+"""
+Admin commands for the Resume2Job backend.
+
+    python manage.py ensure-collections
+    python manage.py build-tfidf-index [--path tfidf_index.joblib]
+    python manage.py backfill-job-features [--force] [--batch-size 400]
+    python manage.py rebuild-applicant-stats
+    python manage.py migrate-user-applications [--keep-array]
+"""
+import argparse
+import os
+
+from utils.firebase_utils import init_firebase, fetch_job_listings, ensure_collections_exist, ensure_messages_collection_exists
+from utils.job_features import FEATURES_FIELD, compute_features, stored_features
+from utils.applicant_stats import STATS_COLLECTION, stats_ref, status_key
+from utils.user_applications import LEGACY_FIELD, SUBCOLLECTION, migration_writes
+from utils.tfidf_index import TfidfJobIndex
+
+# Tries per user when applications written concurrently make the migration's creates conflict
+MIGRATION_ATTEMPTS = 3
+
+
+def ensure_collections(db, args):
+    """Create the placeholder documents the app used to write on every start; run once per project."""
+    ensure_collections_exist(db)
+    ensure_messages_collection_exists(db)
+    print("Collections ready")
+
+
+def build_tfidf_index(db, args):
+    jobs = fetch_job_listings(db)
+    index = TfidfJobIndex(jobs)
+    index.save(args.path)
+    print(f"Indexed {len(index)} job descriptions into {args.path}")
+
+
+def backfill_job_features(db, args):
+    """Write the current match feature block to every job document missing it or holding a stale version."""
+    batch = db.batch()
+    pending = 0
+    updated = 0
+    scanned = 0
+    for doc in db.collection("jobs").stream():
+        scanned += 1
+        job = doc.to_dict()
+        if not args.force and stored_features(job) is not None:
+            continue
+        batch.update(doc.reference, {FEATURES_FIELD: compute_features(job)})
+        pending += 1
+        # Firestore batches take at most 500 writes
+        if pending >= min(args.batch_size, 500):
+            batch.commit()
+            updated += pending
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+        updated += pending
+    print(f"Updated match features on {updated} of {scanned} job documents")
+
+
+def rebuild_applicant_stats(db, args):
+    """Recount the per-job applicant aggregates from the applicants and applications collections."""
+    counts = {}
+    for collection, job_field in (("applicants", "jobId"), ("applications", "job_id")):
+        for doc in db.collection(collection).select([job_field, "status"]).stream():
+            app = doc.to_dict()
+            job_id = app.get(job_field)
+            if not job_id:
+                continue
+            stats = counts.setdefault(job_id, {"jobId": job_id, "total": 0, "byStatus": {}})
+            stats["total"] += 1
+            key = status_key(app.get("status"))
+            stats["byStatus"][key] = stats["byStatus"].get(key, 0) + 1
+    # Jobs whose applications are all gone are reset to zero
+    for doc in db.collection(STATS_COLLECTION).stream():
+        counts.setdefault(doc.id, {"jobId": doc.id, "total": 0, "byStatus": {}})
+    batch = db.batch()
+    for written, (job_id, stats) in enumerate(counts.items(), start=1):
+        batch.set(stats_ref(db, job_id), stats)
+        if written % 400 == 0:
+            batch.commit()
+            batch = db.batch()
+    batch.commit()
+    print(f"Rebuilt applicant stats for {len(counts)} jobs")
+
+
+def migrate_user_applications(db, args):
+    """Move users' legacy applications arrays into users/{uid}/applications/{job_id} documents."""
+    from google.api_core.exceptions import AlreadyExists
+    migrated = 0
+    for user in db.collection("users").select([LEGACY_FIELD]).stream():
+        if LEGACY_FIELD not in (user.to_dict() or {}):
+            continue
+        for attempt in range(MIGRATION_ATTEMPTS):
+            # Documents that exist (written since deploy, or by an earlier run) are never overwritten
+            existing = {doc.id for doc in user.reference.collection(SUBCOLLECTION).select([]).stream()}
+            writes = migration_writes(db, user, existing, keep_array=args.keep_array)
+            if not writes:
+                break
+            try:
+                # The array delete is the last write, so it only lands once every entry is copied
+                for start in range(0, len(writes), 500):
+                    batch = db.batch()
+                    for op, ref, data in writes[start:start + 500]:
+                        getattr(batch, op)(ref, data)
+                    batch.commit()
+            except AlreadyExists:
+                # The candidate applied or changed a status meanwhile; read what exists again
+                continue
+            migrated += 1
+            break
+        else:
+            print(f"Gave up on user {user.id} after {MIGRATION_ATTEMPTS} conflicting attempts")
+    print(f"Migrated applications of {migrated} users")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("ensure-collections", help="Create the Firestore collections the app expects")
+    cmd.set_defaults(func=ensure_collections)
+
+    cmd = commands.add_parser("build-tfidf-index", help="Fit the TF-IDF job index and save it to disk")
+    cmd.add_argument("--path", default=os.environ.get("TFIDF_INDEX_PATH", "tfidf_index.joblib"))
+    cmd.set_defaults(func=build_tfidf_index)
+
+    cmd = commands.add_parser("backfill-job-features", help="Precompute match features on existing job documents")
+    cmd.add_argument("--force", action="store_true", help="Rewrite features that are already current")
+    cmd.add_argument("--batch-size", type=int, default=400)
+    cmd.set_defaults(func=backfill_job_features)
+
+    cmd = commands.add_parser("rebuild-applicant-stats", help="Recount the per-job applicant aggregates")
+    cmd.set_defaults(func=rebuild_applicant_stats)
+
+    cmd = commands.add_parser("migrate-user-applications", help="Move users.applications arrays into a subcollection")
+    cmd.add_argument("--keep-array", action="store_true", help="Copy without deleting the legacy array")
+    cmd.set_defaults(func=migrate_user_applications)
+
+    args = parser.parse_args()
+    args.func(init_firebase(), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Approximate-nearest-neighbour candidate generation for large job catalogs.
+
+An IVF-style coarse quantizer (spherical k-means, numpy/scipy only) over
+per-job feature rows. JobMatrix builds the rows so that row . query is the
+job's unrounded weighted compatibility (skill, experience and education
+columns, each scaled by weight / requirement count). A query probes the
+inverted lists with the best mean score until it has enough candidates; only
+those go through the exact weighted scoring.
+"""
+import numpy as np
+from scipy import sparse
+
+# Rows per block when assigning jobs to centroids, bounds the dense score block
+ASSIGN_CHUNK = 8192
+
+
+def _normalize_rows(matrix):
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(matrix).tocsr().astype(np.float32)
+
+
+def _normalize_dense(centroids):
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return centroids / norms
+
+
+class IVFIndex:
+    def __init__(self, feature_matrix, n_lists=None, n_iter=10, seed=0):
+        features = sparse.csr_matrix(feature_matrix, dtype=np.float32)
+        vectors = _normalize_rows(features)
+        n_rows = vectors.shape[0]
+        # Jobs without any requirement always score 0 and are never candidates
+        has_features = np.diff(vectors.indptr) > 0
+        rows = np.flatnonzero(has_features)
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(rows)))
+        n_lists = max(1, min(n_lists, len(rows)))
+        self.n_rows = n_rows
+        self.n_lists = n_lists if len(rows) else 0
+        self.centroids = np.zeros((self.n_lists, vectors.shape[1]), dtype=np.float32)
+        self.coverage = np.zeros((self.n_lists, vectors.shape[1]), dtype=np.float32)
+        self._list_offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        self._list_rows = np.empty(0, dtype=np.int64)
+        if not len(rows):
+            return
+
+        rng = np.random.default_rng(seed)
+        data = vectors[rows]
+        centroids = data[rng.choice(len(rows), n_lists, replace=False)].toarray()
+        assign = np.zeros(len(rows), dtype=np.int64)
+        for _ in range(n_iter):
+            assign = self._assign(data, centroids)
+            members = sparse.csr_matrix(
+                (np.ones(len(rows), dtype=np.float32), (assign, np.arange(len(rows)))),
+                shape=(n_lists, len(rows)),
+            )
+            sums = (members @ data).toarray()
+            # Re-seed empty lists with random jobs so every list stays useful
+            empty = np.flatnonzero(np.bincount(assign, minlength=n_lists) == 0)
+            if len(empty):
+                sums[empty] = data[rng.choice(len(rows), len(empty), replace=False)].toarray()
+            centroids = _normalize_dense(sums)
+        assign = self._assign(data, centroids)
+
+        self.centroids = centroids.astype(np.float32)
+        # Probing ranks lists by their mean (unnormalized) feature row, so list . query
+        # is the mean compatibility of the list's jobs rather than a cosine
+        counts = np.bincount(assign, minlength=n_lists)
+        members = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (assign, np.arange(len(rows)))),
+            shape=(n_lists, len(rows)),
+        )
+        self.coverage = (members @ features[rows]).toarray() / np.maximum(counts, 1)[:, None]
+        order = np.argsort(assign, kind='stable')
+        self._list_rows = rows[order]
+        self._list_offsets[1:] = np.cumsum(np.bincount(assign, minlength=n_lists))
+
+    @staticmethod
+    def _assign(data, centroids):
+        assign = np.empty(data.shape[0], dtype=np.int64)
+        for start in range(0, data.shape[0], ASSIGN_CHUNK):
+            block = data[start:start + ASSIGN_CHUNK] @ centroids.T
+            assign[start:start + ASSIGN_CHUNK] = np.asarray(block).argmax(axis=1)
+        return assign
+
+    def list_sizes(self):
+        return np.diff(self._list_offsets)
+
+    def search(self, query, n_candidates):
+        """
+        Catalog rows from the inverted lists closest to the query vector, probing
+        lists until at least n_candidates rows are collected. Rows come back sorted,
+        so ties in later ranking keep catalog order.
+        """
+        query = np.asarray(query, dtype=np.float32)[:self.coverage.shape[1]]
+        if not self.n_lists or not query.any():
+            return np.empty(0, dtype=np.int64)
+        probe_order = np.argsort(-(self.coverage @ query), kind='stable')
+        sizes = self.list_sizes()[probe_order]
+        n_probe = int(np.searchsorted(np.cumsum(sizes), n_candidates)) + 1
+        chunks = [
+            self._list_rows[self._list_offsets[lst]:self._list_offsets[lst + 1]]
+            for lst in probe_order[:n_probe].tolist()
+        ]
+        return np.sort(np.concatenate(chunks))
+
+
+def recall_at_k(job_matrix, profile, k=20, n_candidates=None):
+    """
+    recall@k of the approximate path against the exact one. Compatibility has
+    many ties, so an approximate hit counts when its exact score reaches the
+    exact k-th best score.
+    """
+    from utils.matching_engine import top_k_rows
+    scores = job_matrix.score(profile).compatibility
+    exact = top_k_rows(scores, k)
+    if not len(exact):
+        return 1.0
+    approx = job_matrix.ranked_rows(profile, k, mode='approximate', n_candidates=n_candidates)
+    threshold = scores[exact[-1]]
+    return float(np.count_nonzero(scores[approx] >= threshold)) / len(exact)
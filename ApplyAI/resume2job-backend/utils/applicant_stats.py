@@ -0,0 +1,67 @@
+"""
+Per-job applicant counters, denormalized into one aggregate document per job.
+
+jobApplicantStats/{jobId} holds the total number of applications and a
+byStatus breakdown (keys lowercased, so "Applied" and "applied" count
+together). Apply writes increment them in the same batch as the application,
+status changes move a count from the old status to the new one inside a
+transaction, and the recruiter summary reads one document per job instead
+of every applicant.
+"""
+STATS_COLLECTION = "jobApplicantStats"
+
+
+def status_key(status):
+    return str(status or "applied").strip().lower()
+
+
+def stats_ref(db, job_id):
+    return db.collection(STATS_COLLECTION).document(job_id)
+
+
+def applied_write(db, job_id, status="applied"):
+    """("merge", ref, data) write counting one new application; creates the document if needed."""
+    from firebase_admin import firestore
+    return ("merge", stats_ref(db, job_id), {
+        "jobId": job_id,
+        "total": firestore.Increment(1),
+        "byStatus": {status_key(status): firestore.Increment(1)},
+    })
+
+
+def change_status(db, app_ref, new_status, job_field, status_field="status", updates=None, extra_writes=()):
+    """
+    In one transaction: read the application's current status, write new_status (plus
+    updates and any extra (op, ref, data) writes) and move the job's count from the old
+    status to the new one. Returns the application data as read, or None if it does not exist.
+    Blocking; call it through AsyncFirestore.run.
+    """
+    from firebase_admin import firestore
+
+    @firestore.transactional
+    def run(transaction):
+        snapshot = app_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            return None
+        app_data = snapshot.to_dict()
+        transaction.update(app_ref, {**(updates or {}), status_field: new_status})
+        for op, ref, data in extra_writes:
+            if op == "merge":
+                transaction.set(ref, data, merge=True)
+            else:
+                getattr(transaction, op)(ref, data)
+        old_key, new_key = status_key(app_data.get(status_field)), status_key(new_status)
+        job_id = app_data.get(job_field)
+        if job_id and old_key != new_key:
+            transaction.set(stats_ref(db, job_id), {
+                "jobId": job_id,
+                "byStatus": {old_key: firestore.Increment(-1), new_key: firestore.Increment(1)},
+            }, merge=True)
+        return app_data
+
+    return run(db.transaction())
+
+
+def summarize(stats_snapshot):
+    data = stats_snapshot.to_dict() if stats_snapshot is not None and stats_snapshot.exists else {}
+    return {"total": data.get("total", 0), "byStatus": data.get("byStatus", {})}
@@ -0,0 +1,105 @@
+"""
+Awaitable access to the synchronous Firestore client.
+
+Building document references and queries is local, only get / set / update /
+stream go over the network. AsyncFirestore runs those on a dedicated thread
+pool so an async route awaits the round trip instead of blocking the event
+loop, and one slow call no longer stalls every other request on the worker.
+The sync client is kept (rather than firestore.AsyncClient) because the job
+catalog listener, batches and transactions all need it.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import os
+
+# Concurrent Firestore calls per process; the gRPC channel multiplexes them
+FIRESTORE_THREADS = int(os.environ.get("FIRESTORE_THREADS", 32))
+# Documents per get_all (BatchGetDocuments) call; chunks are fetched concurrently
+GET_ALL_CHUNK = 100
+# Writes per batch commit (Firestore's per-batch limit)
+WRITE_BATCH_SIZE = 500
+
+
+class AsyncFirestore:
+    def __init__(self, db, max_workers=FIRESTORE_THREADS):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="firestore")
+
+    def collection(self, name):
+        return self.db.collection(name)
+
+    def document(self, collection, doc_id=None):
+        """Reference to a document; a new auto-ID when doc_id is None. No I/O."""
+        return self.db.collection(collection).document(doc_id)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run any blocking Firestore call (batches, transactions, helpers) on the pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def get(self, ref):
+        return await self.run(ref.get)
+
+    async def set(self, ref, data, merge=False):
+        return await self.run(ref.set, data, merge=merge)
+
+    async def update(self, ref, data):
+        return await self.run(ref.update, data)
+
+    async def get_all(self, refs, chunk_size=GET_ALL_CHUNK, field_paths=None):
+        """
+        Snapshots of many documents keyed by document ID (missing ones have exists False),
+        in chunks of chunk_size issued concurrently instead of one get() per document.
+        field_paths projects the documents to those fields.
+        """
+        refs = list({ref.path: ref for ref in refs}.values())
+        chunks = [refs[start:start + chunk_size] for start in range(0, len(refs), chunk_size)]
+        results = await asyncio.gather(*(self.run(lambda chunk=chunk: list(self.db.get_all(chunk, field_paths=field_paths))) for chunk in chunks))
+        return {snapshot.id: snapshot for snapshots in results for snapshot in snapshots}
+
+    def _batch(self, writes):
+        batch = self.db.batch()
+        for op, ref, data in writes:
+            # op is "set", "merge" (set merged into an existing document) or "update"
+            if op == "merge":
+                batch.set(ref, data, merge=True)
+            else:
+                getattr(batch, op)(ref, data)
+        return batch
+
+    async def commit(self, writes):
+        """Apply up to WRITE_BATCH_SIZE (op, ref, data) writes atomically in one round trip."""
+        return await self.run(self._batch(writes).commit)
+
+    async def commit_many(self, writes, chunk_size=WRITE_BATCH_SIZE):
+        """
+        Apply any number of (op, ref, data) writes as batches of chunk_size committed
+        concurrently. Returns one entry per write: None if it was applied, else the error.
+        A failed batch is retried a write at a time so only the failing writes are reported.
+        """
+        writes = list(writes)
+        chunks = [writes[start:start + chunk_size] for start in range(0, len(writes), chunk_size)]
+        results = await asyncio.gather(*(self._commit_chunk(chunk) for chunk in chunks))
+        return [error for errors in results for error in errors]
+
+    async def _commit_chunk(self, writes):
+        try:
+            await self.commit(writes)
+            return [None] * len(writes)
+        except Exception:
+            return await asyncio.gather(*(self._commit_one(write) for write in writes))
+
+    async def _commit_one(self, write):
+        try:
+            await self.commit([write])
+            return None
+        except Exception as e:
+            return e
+
+    async def stream(self, query):
+        """All documents of a query, as a list."""
+        return await self.run(lambda: list(query.stream()))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,129 @@
+"""
+Bounded pool of long-lived document converters.
+
+Building a Docling DocumentConverter loads its layout and table models, which
+takes seconds; the pool builds converters once per worker process and hands
+them out one request at a time. At most `size` converters exist, a caller
+waits for a free one (or gets TimeoutError), and each converter is retired
+after `max_documents` conversions, or after `max_failures` conversions in a
+row that raised, so memory held by a converter cannot grow without bound and
+a broken one is replaced. Converters are built on first use or by warm().
+"""
+from contextlib import contextmanager
+import os
+import threading
+
+DOCLING_POOL_SIZE = int(os.environ.get("DOCLING_POOL_SIZE", 1))
+# Conversions before a converter is replaced
+DOCLING_MAX_DOCUMENTS = int(os.environ.get("DOCLING_MAX_DOCUMENTS", 200))
+# Consecutive failed conversions before a converter is replaced
+DOCLING_MAX_FAILURES = 3
+
+
+class _Entry:
+    def __init__(self, converter):
+        self.converter = converter
+        self.documents = 0
+        self.failures = 0
+
+
+class ConverterPool:
+    def __init__(self, factory, size=DOCLING_POOL_SIZE, max_documents=DOCLING_MAX_DOCUMENTS, max_failures=DOCLING_MAX_FAILURES):
+        self.factory = factory
+        self.size = size
+        self.max_documents = max_documents
+        self.max_failures = max_failures
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self.created = 0
+        self.retired = 0
+        self.converted = 0
+        self.failed = 0
+        # Last failed converter build (cleared by a successful one) and last failed conversion
+        self.create_error = None
+        self.last_error = None
+
+    def _create(self):
+        try:
+            entry = _Entry(self.factory())
+        except Exception as e:
+            self.create_error = str(e)
+            raise
+        with self._lock:
+            self.created += 1
+            self.create_error = None
+        return entry
+
+    def warm(self):
+        """Build converters until the pool is full, so the first requests do not pay for it."""
+        # Built while holding a slot, like a request would, so the pool never exceeds size
+        while self._slots.acquire(blocking=False):
+            try:
+                with self._lock:
+                    if len(self._idle) + self._in_use >= self.size:
+                        return
+                    self._in_use += 1
+                try:
+                    entry = self._create()
+                finally:
+                    with self._lock:
+                        self._in_use -= 1
+                with self._lock:
+                    self._idle.append(entry)
+            finally:
+                self._slots.release()
+
+    @contextmanager
+    def converter(self, timeout=None):
+        """A converter for the duration of the with block; TimeoutError if none is free within timeout seconds."""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No document converter free")
+        entry = None
+        try:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+                self._in_use += 1
+            if entry is None:
+                entry = self._create()
+            try:
+                yield entry.converter
+            except Exception as e:
+                entry.failures += 1
+                with self._lock:
+                    self.failed += 1
+                self.last_error = str(e)
+                raise
+            else:
+                entry.failures = 0
+                with self._lock:
+                    self.converted += 1
+            finally:
+                entry.documents += 1
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                if entry is not None:
+                    if entry.documents >= self.max_documents or entry.failures >= self.max_failures:
+                        # Dropped here; the next caller builds a fresh one
+                        self.retired += 1
+                    else:
+                        self._idle.append(entry)
+            self._slots.release()
+
+    def health(self):
+        with self._lock:
+            return {
+                # Unhealthy while converters cannot be built
+                "healthy": self.create_error is None,
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created": self.created,
+                "retired": self.retired,
+                "converted": self.converted,
+                "failed": self.failed,
+                "create_error": self.create_error,
+                "last_error": self.last_error,
+            }
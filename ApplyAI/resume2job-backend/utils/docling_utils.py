@@ -1,23 +1,126 @@
-from docling.document_converter import DocumentConverter
-import fitz  # PyMuPDF
+from collections import namedtuple
+from io import BytesIO
+import os
+import re
+import unicodedata
 
-def parse_resume(file_path):
-    # Docling extraction
+from utils.converter_pool import ConverterPool
+
+# Part of the parse cache key (utils/parse_cache.py); bump when parse_resume's
+# output or the fields extracted from its markdown change
+PARSER_VERSION = "2"
+
+# Section headers the field extraction looks for, per section
+SECTION_HEADERS = {
+    'skills': ["skills", "skill set", "technical skills", "core skills"],
+    'experience': ["experience", "professional experience", "work history", "experiences"],
+    'education': ["education", "educations", "education & certifications", "academic background"]
+}
+
+# Text layers scoring at least this skip Docling (see text_layer_quality)
+FAST_PATH_MIN_QUALITY = float(os.environ.get("FAST_PATH_MIN_QUALITY", 0.75))
+# Non-whitespace characters for a full length score
+QUALITY_FULL_LENGTH = 800
+# Share of garbage characters at which the score drops to 0
+QUALITY_MAX_GARBAGE = 0.05
+# Longest line still taken for a section header
+HEADER_MAX_CHARS = 40
+# Glyphs PyMuPDF could not map to Unicode come out as "(cid:123)"
+CID_PATTERN = re.compile(r'\(cid:\d+\)')
+
+ParsedResume = namedtuple('ParsedResume', ['markdown', 'links', 'plain_text', 'path', 'quality'])
+
+
+def new_converter():
+    # Imported on first use: docling alone takes seconds to import
+    from docling.datamodel.base_models import InputFormat
+    from docling.document_converter import DocumentConverter
     converter = DocumentConverter()
-    docling_result = converter.convert(file_path)
-    doc_markdown = docling_result.document.export_to_markdown()
+    # Load the PDF pipeline's models now rather than on the first conversion
+    converter.initialize_pipeline(InputFormat.PDF)
+    return converter
 
-    # PyMuPDF extraction for links and plain text
+
+# Converters kept warm for the life of the worker process
+converter_pool = ConverterPool(new_converter)
+
+
+def file_type(filename):
+    # PyMuPDF cannot sniff the type of a stream; the upload's extension stands in for it
+    return os.path.splitext(filename or '')[1].lstrip('.').lower() or 'pdf'
+
+
+def extract_text_and_links(doc):
+    """Plain text and link URIs of an open PyMuPDF document."""
+    links = []
+    plain_text = ""
+    for page in doc:
+        plain_text += page.get_text()
+        for link in page.get_links():
+            if link.get("uri"):
+                links.append(link["uri"])
+    return plain_text, links
+
+
+def pdf_text_and_links(content, filename):
+    """Plain text and links of an uploaded file, read from memory with PyMuPDF."""
+    import fitz  # PyMuPDF
+    with fitz.open(stream=content, filetype=file_type(filename)) as doc:
+        return extract_text_and_links(doc)
+
+
+def text_layer_quality(plain_text):
+    """
+    0..1 score of how usable a PDF's text layer is for field extraction: half
+    for length, half for the SECTION_HEADERS kinds found on header lines,
+    scaled down by the share of garbage characters (unmapped glyphs, control
+    and private-use characters). Scanned or image-only PDFs score 0.
+    """
+    text = CID_PATTERN.sub('\ufffd', plain_text or '')
+    chars = [c for c in text if not c.isspace()]
+    if not chars:
+        return 0.0
+    garbage = sum(1 for c in chars if c == '\ufffd' or unicodedata.category(c) in ('Cc', 'Co', 'Cn'))
+    sections = set()
+    for line in text.splitlines():
+        line = line.strip().strip('#:').strip().lower()
+        if line and len(line) <= HEADER_MAX_CHARS:
+            sections.update(sec for sec, headers in SECTION_HEADERS.items() if any(h in line for h in headers))
+    length_score = min(len(chars) / QUALITY_FULL_LENGTH, 1.0)
+    section_score = min(len(sections) / 2, 1.0)
+    clean = 1.0 - min(garbage / len(chars) / QUALITY_MAX_GARBAGE, 1.0)
+    return round((length_score + section_score) / 2 * clean, 3)
+
+
+def parse_resume(content, filename, high_fidelity=False):
+    """
+    ParsedResume of an uploaded resume, parsed from its bytes without a temp
+    file. When PyMuPDF's text layer scores at least FAST_PATH_MIN_QUALITY the
+    plain text doubles as the markdown and Docling is skipped (path "pymupdf");
+    otherwise, or with high_fidelity, Docling converts the document (path
+    "docling"). markdown is None when Docling fails, so callers can fall back
+    to the plain text that was already extracted.
+    """
+    # PyMuPDF extraction for links and plain text, from one opened document
     links = []
     plain_text = ""
     try:
-        doc = fitz.open(file_path)
-        for page in doc:
-            plain_text += page.get_text()
-            for link in page.get_links():
-                if link.get("uri"):
-                    links.append(link["uri"])
+        plain_text, links = pdf_text_and_links(content, filename)
     except Exception as e:
         print(f"[PyMuPDF] Error extracting links/text: {e}")
 
-    return doc_markdown, links, plain_text 
\ No newline at end of file
+    quality = text_layer_quality(plain_text)
+    if not high_fidelity and quality >= FAST_PATH_MIN_QUALITY:
+        return ParsedResume(plain_text, links, plain_text, "pymupdf", quality)
+
+    # Docling extraction
+    from docling.datamodel.base_models import DocumentStream
+    doc_markdown = None
+    try:
+        with converter_pool.converter() as converter:
+            docling_result = converter.convert(DocumentStream(name=filename or 'resume.pdf', stream=BytesIO(content)))
+        doc_markdown = docling_result.document.export_to_markdown()
+    except Exception as e:
+        print(f"[Docling] Error converting {filename}: {e}")
+
+    return ParsedResume(doc_markdown, links, plain_text, "docling", quality)
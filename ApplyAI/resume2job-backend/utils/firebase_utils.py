@@ -1,7 +1,7 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-
 def init_firebase():
+    # Imported here so SQLite deployments do not need the Firebase SDK
+    import firebase_admin
+    from firebase_admin import credentials, firestore
     cred = credentials.Certificate("firebase_service_account.json")
     firebase_admin.initialize_app(cred)
     return firestore.client()
@@ -23,13 +23,13 @@ def ensure_messages_collection_exists(db):
     if not docs:
         db.collection(col).document('init').set({'init': True})
 
+def job_from_doc(doc):
+    job = doc.to_dict()
+    job["job_id"] = doc.id
+    # Normalize recruiterId field
+    job["recruiterId"] = job.get("recruiterId") or job.get("recruiterID") or ""
+    return job
+
 def fetch_job_listings(db, collection="jobs"):
     job_docs = db.collection(collection).stream()
-    jobs = []
-    for doc in job_docs:
-        job = doc.to_dict()
-        job["job_id"] = doc.id
-        # Normalize recruiterId field
-        job["recruiterId"] = job.get("recruiterId") or job.get("recruiterID") or ""
-        jobs.append(job)
-    return jobs 
\ No newline at end of file
+    return [job_from_doc(doc) for doc in job_docs]
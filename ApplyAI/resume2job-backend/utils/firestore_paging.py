@@ -0,0 +1,57 @@
+"""
+Cursor pagination for Firestore list queries.
+
+Pages are ordered by the given fields and then by document ID, so every
+document has a unique position. The cursor handed to clients is an opaque,
+url-safe encoding of the last document's order values and ID; it is passed
+back as start_after to read the next page.
+"""
+import base64
+import json
+
+MAX_PAGE_SIZE = 500
+DOCUMENT_ID = "__name__"
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def paged_query(query, order_by=(), page_size=None, start_after=None, fields=None):
+    """
+    query ordered by order_by then document ID, projected to fields (plus the order
+    fields) when given, resumed after the start_after cursor and limited to page_size.
+    Raises ValueError for a cursor that does not belong to this ordering.
+    """
+    order_by = list(order_by)
+    for field in order_by:
+        query = query.order_by(field)
+    query = query.order_by(DOCUMENT_ID)
+    if fields is not None:
+        query = query.select(sorted(set(fields) | set(order_by)))
+    if start_after:
+        values = decode_cursor(start_after)
+        if len(values) != len(order_by) + 1:
+            raise ValueError("Invalid cursor")
+        query = query.start_after(dict(zip(order_by + [DOCUMENT_ID], values)))
+    if page_size:
+        query = query.limit(page_size)
+    return query
+
+
+def next_cursor(docs, order_by=(), page_size=None):
+    """Cursor after the last of docs, or None when this was the last page (or paging is off)."""
+    if not page_size or len(docs) < page_size:
+        return None
+    last = docs[-1]
+    return encode_cursor([last.get(field) for field in order_by] + [last.id])
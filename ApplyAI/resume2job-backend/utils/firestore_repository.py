@@ -0,0 +1,174 @@
+"""
+Repository backed by Cloud Firestore, through AsyncFirestore so no call blocks the event loop.
+
+Collections: users (with users/{uid}/applications), recruiters, jobs,
+applicants, applications, messages, bulkMessageJobs and the per-job counters
+in jobApplicantStats. Paging uses the opaque cursors of utils.firestore_paging.
+"""
+from firebase_admin import firestore
+
+from utils.async_firestore import AsyncFirestore
+from utils.applicant_stats import STATS_COLLECTION, applied_write, change_status, summarize
+from utils.firebase_utils import fetch_job_listings
+from utils.firestore_paging import next_cursor, paged_query
+from utils.repository import Page, Repository
+from utils import user_applications
+
+
+def _page(docs, order_by=(), page_size=None):
+    return Page([(doc.id, doc.to_dict()) for doc in docs], next_cursor(docs, order_by, page_size))
+
+
+def _data(snapshot):
+    return snapshot.to_dict() if snapshot.exists else None
+
+
+class FirestoreRepository(Repository):
+    def __init__(self, db):
+        self.db = db
+        self.store = AsyncFirestore(db)
+
+    def new_id(self, collection):
+        return self.store.document(collection).id
+
+    def job_catalog(self, tfidf_index=None):
+        # Jobs collection cached in memory and kept current by a snapshot listener;
+        # returns at once, the catalog reports ready after the initial snapshot
+        from utils.job_catalog import JobCatalog
+        return JobCatalog(self.db, tfidf_index=tfidf_index).start(timeout=0)
+
+    def close(self):
+        self.store.close()
+
+    async def _get(self, collection, doc_id):
+        return _data(await self.store.get(self.store.document(collection, doc_id)))
+
+    async def _list(self, query, order_by=(), page_size=None, start_after=None, fields=None):
+        docs = await self.store.stream(paged_query(query, order_by, page_size, start_after, fields))
+        return _page(docs, order_by, page_size)
+
+    # Users
+
+    async def get_user(self, uid, fields=None):
+        snapshot = await self.store.run(self.store.document('users', uid).get, field_paths=fields)
+        return _data(snapshot)
+
+    async def get_users(self, uids, fields=None):
+        users = await self.store.get_all((self.store.document('users', uid) for uid in uids), field_paths=fields)
+        return {uid: snapshot.to_dict() for uid, snapshot in users.items() if snapshot.exists}
+
+    async def set_user(self, uid, data, merge=False):
+        await self.store.set(self.store.document('users', uid), data, merge=merge)
+
+    # Recruiters
+
+    async def get_recruiter(self, recruiter_id):
+        return await self._get('recruiters', recruiter_id)
+
+    async def set_recruiter(self, recruiter_id, data):
+        await self.store.set(self.store.document('recruiters', recruiter_id), data)
+
+    async def update_recruiter(self, recruiter_id, data):
+        await self.store.update(self.store.document('recruiters', recruiter_id), data)
+
+    # Jobs
+
+    async def get_job(self, job_id):
+        return await self._get('jobs', job_id)
+
+    async def set_job(self, job_id, data):
+        await self.store.set(self.store.document('jobs', job_id), data)
+
+    async def list_jobs(self, recruiter_id, page_size=None, start_after=None, fields=None):
+        return await self._list(
+            self.store.collection('jobs').where('recruiterId', '==', recruiter_id),
+            page_size=page_size, start_after=start_after, fields=fields
+        )
+
+    async def all_jobs(self):
+        return await self.store.run(fetch_job_listings, self.db)
+
+    async def applicant_summary(self, recruiter_id):
+        # One aggregate document read per job
+        job_docs = await self.store.stream(self.store.collection('jobs').where('recruiterId', '==', recruiter_id).select(['title']))
+        stats = await self.store.get_all(self.store.document(STATS_COLLECTION, job.id) for job in job_docs)
+        return [
+            {"jobId": job.id, "title": job.to_dict().get("title"), **summarize(stats.get(job.id))}
+            for job in job_docs
+        ]
+
+    # Applicants
+
+    async def add_applicant(self, applicant_id, data):
+        await self.store.commit([
+            ("set", self.store.document('applicants', applicant_id), data),
+            applied_write(self.db, data["jobId"], data.get("status")),
+        ])
+
+    async def list_applicants(self, job_id, page_size=None, start_after=None, fields=None):
+        return await self._list(
+            self.store.collection('applicants').where('jobId', '==', job_id),
+            page_size=page_size, start_after=start_after, fields=fields
+        )
+
+    async def set_applicant_status(self, applicant_id, new_status):
+        applicant_ref = self.store.document('applicants', applicant_id)
+        return await self.store.run(change_status, self.db, applicant_ref, new_status, "jobId") is not None
+
+    # Applications
+
+    async def get_application(self, application_id):
+        return await self._get('applications', application_id)
+
+    async def add_application(self, application_id, data):
+        job_id, candidate_uid = data["job_id"], data["candidate_uid"]
+        # The update fails the whole batch when the job does not exist
+        await self.store.commit([
+            ("set", self.store.document('applications', application_id), data),
+            ("update", self.store.document('jobs', job_id), {"applicants": firestore.ArrayUnion([candidate_uid])}),
+            user_applications.applied_write(self.db, candidate_uid, job_id, data["applied_at"]),
+            applied_write(self.db, job_id, data.get("status")),
+        ])
+
+    async def list_applications(self, job_id, page_size=None, start_after=None, fields=None):
+        return await self._list(
+            self.store.collection('applications').where('job_id', '==', job_id),
+            page_size=page_size, start_after=start_after, fields=fields
+        )
+
+    async def update_application(self, application_id, application, updates):
+        app_ref = self.store.document('applications', application_id)
+        new_status = updates.get("status")
+        if not new_status:
+            await self.store.update(app_ref, updates)
+            return
+        writes = []
+        if application.get("candidate_uid"):
+            writes.append(user_applications.status_write(self.db, application["candidate_uid"], application["job_id"], new_status))
+        await self.store.run(change_status, self.db, app_ref, new_status, "job_id", updates=updates, extra_writes=writes)
+
+    # Messages
+
+    async def add_message(self, message_id, data):
+        await self.store.set(self.store.document('messages', message_id), data)
+
+    async def add_messages(self, messages):
+        return await self.store.commit_many(
+            ("set", self.store.document('messages', message_id), data) for message_id, data in messages
+        )
+
+    async def list_messages(self, job_id, recruiter_id, applicant_id, page_size=None, start_after=None, fields=None):
+        # Served by the composite index declared in firestore.indexes.json
+        return await self._list(
+            self.store.collection('messages')
+                .where('jobId', '==', job_id)
+                .where('recruiterId', '==', recruiter_id)
+                .where('applicantId', '==', applicant_id),
+            order_by=['timestamp'], page_size=page_size, start_after=start_after, fields=fields
+        )
+
+    async def get_bulk_message_job(self, bulk_job_id):
+        return await self._get('bulkMessageJobs', bulk_job_id)
+
+    async def set_bulk_message_job(self, bulk_job_id, data, merge=False):
+        await self.store.set(self.store.document('bulkMessageJobs', bulk_job_id), data, merge=merge)
@@ -0,0 +1,127 @@
+"""
+Precomputed fuzzy-equivalence table over the skill vocabulary.
+
+Replaces per-job difflib.get_close_matches(..., cutoff=0.8) calls with table
+lookups. The neighbour graph is built once over every interned skill ID:
+rapidfuzz's Indel ratio is an upper bound of difflib's ratio, so it is used
+to prefilter candidate pairs, which are then confirmed with difflib to keep
+the exact 0.8-cutoff semantics. Pairs involving skills outside the table go
+through a small LRU. The process-wide table (fuzzy_table()) is built on first
+use, so importing the matching modules loads neither rapidfuzz nor the table.
+"""
+from collections import namedtuple
+from difflib import SequenceMatcher
+from functools import lru_cache
+import threading
+
+from utils.skill_taxonomy import normalize_many, normalize_skill, skill_name, vocabulary_size
+
+FUZZY_CUTOFF = 0.8
+# Rows of the rapidfuzz score matrix computed at once while building
+BUILD_CHUNK = 512
+
+# Resume-side skill sets prepared once for a run of has_close_match calls
+ResumeSkills = namedtuple('ResumeSkills', ['ids', 'table_ids', 'other_names'])
+
+
+class FuzzySkillTable:
+    def __init__(self, cutoff=FUZZY_CUTOFF, cache_size=4096):
+        self.cutoff = cutoff
+        # neighbours[j] = IDs r with ratio(r, j) >= cutoff, i.e. resume skill r
+        # fuzzy-matches job skill j the way get_close_matches(j, [r]) would
+        self._neighbours = []
+        self._lock = threading.Lock()
+        self._is_close = lru_cache(maxsize=cache_size)(self._ratio_ok)
+
+    def __len__(self):
+        return len(self._neighbours)
+
+    def _ratio_ok(self, resume_name, job_name):
+        # Same orientation as get_close_matches(job_name, [resume_name])
+        return SequenceMatcher(None, resume_name, job_name).ratio() >= self.cutoff
+
+    def _candidate_pairs(self, queries, choices):
+        """(query index, choice index) pairs whose rapidfuzz ratio reaches the cutoff."""
+        import numpy as np
+        from rapidfuzz import fuzz, process as fuzz_process
+        # Small slack so float differences can't drop a pair difflib would keep
+        score_cutoff = self.cutoff * 100 - 0.01
+        for start in range(0, len(queries), BUILD_CHUNK):
+            scores = fuzz_process.cdist(
+                queries[start:start + BUILD_CHUNK], choices,
+                scorer=fuzz.ratio, score_cutoff=score_cutoff, workers=-1,
+            )
+            rows, cols = np.nonzero(scores)
+            yield from zip((rows + start).tolist(), cols.tolist())
+
+    def update(self):
+        """
+        Extend the table to cover every skill ID interned so far.
+        Only pairs involving new IDs are computed, so calling this after each
+        catalog rebuild is cheap.
+        """
+        with self._lock:
+            old_size = len(self._neighbours)
+            size = vocabulary_size()
+            if size == old_size:
+                return
+            names = [skill_name(sid) for sid in range(size)]
+            rows = [set(row) for row in self._neighbours] + [set() for _ in range(size - old_size)]
+            # New job-side IDs against every resume-side ID
+            for j, r in self._candidate_pairs(names[old_size:], names):
+                if self._ratio_ok(names[r], names[old_size + j]):
+                    rows[old_size + j].add(r)
+            # Existing job-side IDs against the new resume-side IDs
+            if old_size:
+                for j, r in self._candidate_pairs(names[:old_size], names[old_size:]):
+                    if self._ratio_ok(names[old_size + r], names[j]):
+                        rows[j].add(old_size + r)
+            # Swap in the new table in one assignment so readers never see a partial one
+            self._neighbours = [frozenset(row) for row in rows]
+
+    def neighbours(self, skill_id):
+        """IDs within the cutoff of skill_id, or None if skill_id is not in the table yet."""
+        neighbours = self._neighbours
+        return neighbours[skill_id] if skill_id < len(neighbours) else None
+
+    def prepare(self, resume_skills):
+        """Resolve the resume skills once: all known IDs, IDs in the table, and names of the rest."""
+        ids = normalize_many(resume_skills, intern=False).tolist()
+        size = len(self._neighbours)
+        known = frozenset(sid for sid in ids if sid >= 0)
+        table_ids = frozenset(sid for sid in known if sid < size)
+        other_names = tuple(dict.fromkeys(
+            skill_name(sid) if sid >= 0 else normalize_skill(skill)
+            for sid, skill in zip(ids, resume_skills)
+            if sid not in table_ids
+        ))
+        return ResumeSkills(known, table_ids, other_names)
+
+    def has_close_match(self, job_skill_id, resume):
+        """True if any resume skill is within the cutoff of the job skill (get_close_matches semantics)."""
+        row = self.neighbours(job_skill_id)
+        job_name = skill_name(job_skill_id)
+        if row is None:
+            # Job skill newer than the table: compare against every resume skill through the LRU
+            return any(self._is_close(skill_name(sid), job_name) for sid in resume.table_ids) or \
+                any(self._is_close(name, job_name) for name in resume.other_names)
+        if not row.isdisjoint(resume.table_ids):
+            return True
+        return any(self._is_close(name, job_name) for name in resume.other_names)
+
+
+_fuzzy_table = None
+_fuzzy_table_lock = threading.Lock()
+
+
+def fuzzy_table():
+    """The process-wide table, covering the canonical skills from first use; catalogs extend it as they are compiled."""
+    global _fuzzy_table
+    if _fuzzy_table is not None:
+        return _fuzzy_table
+    with _fuzzy_table_lock:
+        if _fuzzy_table is None:
+            table = FuzzySkillTable()
+            table.update()
+            _fuzzy_table = table
+        return _fuzzy_table
@@ -0,0 +1,76 @@
+"""
+Inverted index from match terms (canonical skills, experience and education
+keywords) to postings lists of job rows, with MaxScore-style top-k pruning.
+
+The postings hold each job's term weight (weight / requirement count, the
+columns of JobMatrix.ann_features), so the sum over a job's matched terms is
+its unrounded compatibility. Terms are visited by descending upper bound and
+candidates are scored exactly; once the jobs that could only match the
+unvisited terms can no longer reach the current k-th best score, the rest of
+the catalog is never touched.
+"""
+import numpy as np
+from scipy import sparse
+
+# Bound on how far rounding (skill/exp/edu scores, then compatibility) can
+# push a rounded score above the unrounded term sum
+SCORE_SLACK = 0.02
+
+
+class InvertedSkillIndex:
+    def __init__(self, feature_matrix):
+        postings = sparse.csc_matrix(feature_matrix, dtype=np.float64)
+        postings.sort_indices()
+        self.postings = postings
+        self.n_rows = postings.shape[0]
+        # Per-term upper bound of the contribution to compatibility (0-100 scale)
+        self.max_contribution = np.zeros(postings.shape[1], dtype=np.float64)
+        has_postings = np.diff(postings.indptr) > 0
+        self.max_contribution[has_postings] = np.maximum.reduceat(
+            postings.data, postings.indptr[:-1][has_postings]
+        ) * 100
+
+    def posting_rows(self, term):
+        return self.postings.indices[self.postings.indptr[term]:self.postings.indptr[term + 1]]
+
+    def top_k_candidates(self, terms, k, score_rows):
+        """
+        Sorted job rows guaranteed to contain the exact top-k, or None when the
+        full scan is needed (fewer than k jobs can score above 0).
+        score_rows(rows) must return the exact compatibility of the given rows.
+        """
+        terms = np.asarray(terms, dtype=np.int64)
+        terms = terms[self.max_contribution[terms] > 0]
+        if k <= 0 or not len(terms):
+            return None
+        bounds = self.max_contribution[terms]
+        order = np.argsort(-bounds, kind='stable')
+        terms, bounds = terms[order], bounds[order]
+        # remaining[i]: best score a job matching only terms[i:] can reach
+        remaining = np.append(np.cumsum(bounds[::-1])[::-1], 0.0)
+
+        seen = np.zeros(self.n_rows, dtype=bool)
+        n_seen = 0
+        threshold = -np.inf
+        scored = 0
+        for i, term in enumerate(terms.tolist()):
+            if remaining[i] + SCORE_SLACK < threshold:
+                # Unvisited jobs score strictly below the k-th candidate: stop
+                return np.flatnonzero(seen)
+            seen[self.posting_rows(term)] = True
+            # Re-derive the threshold whenever the candidate pool has doubled
+            if i + 1 < len(terms) and remaining[i + 1] + SCORE_SLACK >= threshold:
+                n_seen = np.count_nonzero(seen)
+                if n_seen >= k and n_seen >= 2 * scored:
+                    scores = score_rows(np.flatnonzero(seen))
+                    scored = n_seen
+                    threshold = np.partition(scores, n_seen - k)[n_seen - k]
+        # Every job sharing a term is a candidate; the rest score 0, which only
+        # matters when the k-th candidate is not above 0
+        candidates = np.flatnonzero(seen)
+        if len(candidates) < k:
+            return None
+        scores = score_rows(candidates)
+        if np.partition(scores, len(scores) - k)[len(scores) - k] <= 0:
+            return None
+        return candidates
@@ -0,0 +1,172 @@
+"""
+Process-wide job catalog kept current by a Firestore snapshot listener.
+
+The catalog loads once from the listener's initial snapshot and then applies
+the add / modify / remove changes Firestore pushes, so /match-resume no
+longer streams the whole jobs collection per request. Applying a change only
+updates the job dict (O(changes)); publishing builds a new set of derived
+indexes off to the side and swaps them in with a single assignment together
+with a new version number: readers take snapshot() once per request and
+never see a half-updated catalog.
+
+A publish costs O(catalog size) whatever the number of changes: the
+JobMatrix, its inverted index and (in approximate mode) the ANN index are
+rebuilt from the full job list, and the TF-IDF index is copied and patched.
+So changes are coalesced: after the initial load, a publish runs on a timer
+thread CATALOG_DEBOUNCE_SECONDS after the first unpublished change and takes
+every change received meanwhile, so a burst of edits costs one rebuild and
+the listener thread never builds anything.
+
+Only db.collection(name).on_snapshot(callback) and the returned watch's
+unsubscribe() are used, so an in-memory fake client can drive it (see
+utils/test_job_catalog.py).
+"""
+from collections import namedtuple
+import os
+import threading
+
+from utils.firebase_utils import job_from_doc
+from utils.matching_engine import ANN_MIN_JOBS, MATCH_MODE, JobMatrix
+
+CatalogSnapshot = namedtuple('CatalogSnapshot', ['version', 'jobs', 'job_matrix', 'tfidf_index'])
+
+# Delay between the first unpublished change and the rebuild that publishes it (0: publish on every batch)
+CATALOG_DEBOUNCE_SECONDS = float(os.environ.get("CATALOG_DEBOUNCE_SECONDS", 1.0))
+
+
+class JobCatalog:
+    def __init__(self, db, collection="jobs", tfidf_index=None, debounce=CATALOG_DEBOUNCE_SECONDS):
+        self.db = db
+        self.collection = collection
+        self.debounce = debounce
+        self._jobs = {}
+        # Changes since the last publish, for the TF-IDF index's incremental update
+        self._removed = set()
+        self._upserted = {}
+        self._timer = None
+        self._current = CatalogSnapshot(0, [], None, tfidf_index)
+        # Guards the job dict and pending changes; readers only ever read self._current
+        self._lock = threading.Lock()
+        # Serializes publishes, so versions go out in order
+        self._publish_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._watch = None
+
+    def __len__(self):
+        return len(self._current.jobs)
+
+    @property
+    def version(self):
+        """Incremented every time a new catalog is published."""
+        return self._current.version
+
+    @property
+    def ready(self):
+        """True once the initial snapshot has been loaded."""
+        return self._ready.is_set()
+
+    def snapshot(self):
+        """The current CatalogSnapshot; keep using the same one for a whole request."""
+        return self._current
+
+    def start(self, timeout=None):
+        """Subscribe to the collection and wait up to timeout seconds (0: not at all) for the initial load."""
+        self._watch = self.db.collection(self.collection).on_snapshot(self._on_snapshot)
+        if timeout != 0 and not self._ready.wait(timeout):
+            print(f"[JobCatalog] Initial snapshot of '{self.collection}' not received yet")
+        return self
+
+    def stop(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _on_snapshot(self, docs, changes, read_time):
+        # Runs on the listener thread; an exception here would end the watch
+        try:
+            self.apply_changes(changes)
+        except Exception as e:
+            print(f"[JobCatalog] Failed to apply snapshot: {e}")
+
+    def apply_changes(self, changes):
+        """
+        Apply a batch of document changes (the initial snapshot is all ADDED). The
+        initial load is published at once; later changes within the debounce window
+        are published together by flush() on a timer thread.
+        """
+        with self._lock:
+            for change in changes:
+                doc = change.document
+                if change.type.name == 'REMOVED':
+                    self._jobs.pop(doc.id, None)
+                    self._upserted.pop(doc.id, None)
+                    self._removed.add(doc.id)
+                else:
+                    self._jobs[doc.id] = self._upserted[doc.id] = job_from_doc(doc)
+                    self._removed.discard(doc.id)
+            publish_now = not self.ready or self.debounce <= 0
+            if not publish_now and changes and self._timer is None:
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if publish_now:
+            self.flush()
+            # Not ready until the initial load has actually been published
+            if self.version:
+                self._ready.set()
+
+    def flush(self):
+        """
+        Publish the changes applied since the last publish, if any. Blocking (rebuilds
+        the indexes); if the rebuild fails the changes stay pending for the next flush.
+        """
+        with self._publish_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if self.ready and not (self._removed or self._upserted):
+                    return
+                jobs = dict(self._jobs)
+                removed, self._removed = self._removed, set()
+                upserted, self._upserted = self._upserted, {}
+            try:
+                self._publish(jobs, removed, upserted)
+            except Exception as e:
+                # Keep the changes for the next publish; ones received since take precedence
+                with self._lock:
+                    for job_id in removed:
+                        if job_id not in self._upserted:
+                            self._removed.add(job_id)
+                    for job_id, job in upserted.items():
+                        if job_id not in self._removed:
+                            self._upserted.setdefault(job_id, job)
+                print(f"[JobCatalog] Publish failed: {e}")
+
+    def _publish(self, jobs, removed, upserted):
+        # Same order as fetch_job_listings (document ID), so ties rank the same way
+        job_list = [jobs[job_id] for job_id in sorted(jobs)]
+        job_matrix = None
+        if job_list:
+            job_matrix = JobMatrix(job_list)
+            # Warm the top-k indexes here rather than on the first request
+            job_matrix.inverted
+            if MATCH_MODE == 'approximate' and len(job_list) >= ANN_MIN_JOBS:
+                job_matrix.build_ann()
+        tfidf_index = self._current.tfidf_index
+        if tfidf_index is not None:
+            if not self._current.version:
+                # A prebuilt index may still have jobs deleted since it was saved
+                removed = removed | (set(tfidf_index.job_ids) - set(jobs))
+            # Unchanged descriptions are skipped, so a prebuilt index is patched rather than refitted
+            tfidf_index = tfidf_index.copy()
+            tfidf_index.remove_jobs(removed)
+            tfidf_index.add_jobs(upserted.values())
+            if tfidf_index.needs_refit:
+                tfidf_index.refit()
+        self._current = CatalogSnapshot(self._current.version + 1, job_list, job_matrix, tfidf_index)
+        print(f"[JobCatalog] Published version {self._current.version} with {len(job_list)} jobs")
@@ -0,0 +1,80 @@
+"""
+Precomputed match features stored on job documents.
+
+POST /recruiter/jobs (and `python manage.py backfill-job-features` for older
+documents) writes a versioned `match_features` block with everything the
+matcher would otherwise re-derive per request: the resolved requirement
+lists, normalized skill names, lowered experience/education keywords and
+the canonical employment type. Readers use the block only when its version
+matches FEATURE_VERSION and recompute from the raw fields otherwise, so
+bumping the version after changing any derivation below is enough to
+invalidate every stored block.
+"""
+from utils.skill_taxonomy import name_ids, normalize_many, normalize_skill
+
+FEATURE_VERSION = 1
+FEATURES_FIELD = "match_features"
+
+
+def raw_requirements(job):
+    """(skills, experience, education) requirement lists from the raw job fields, with fallbacks."""
+    job_skills = job.get('skills_required', []) or job.get('skills', []) or []
+    job_experience = job.get('experience_required', []) or job.get('experience', []) or []
+    job_education = job.get('education_required', []) or job.get('education', []) or []
+    return job_skills, job_experience, job_education
+
+
+def canonical_employment_type(job):
+    raw_employment = job.get("employment_type") or job.get("employment") or ""
+    employment_type = ""
+    if isinstance(raw_employment, str):
+        emp = raw_employment.strip().lower().replace('-', ' ').replace('_', ' ')
+        if 'full' in emp:
+            employment_type = 'Full Time'
+        elif 'part' in emp:
+            employment_type = 'Part Time'
+        elif 'intern' in emp:
+            employment_type = 'Internship'
+        else:
+            employment_type = raw_employment.strip()
+    return employment_type
+
+
+def _lowered(keywords):
+    return [kw.lower() if isinstance(kw, str) else kw for kw in keywords]
+
+
+def compute_features(job):
+    """The feature block for a job document, from its raw fields."""
+    job_skills, job_experience, job_education = raw_requirements(job)
+    return {
+        "version": FEATURE_VERSION,
+        # Requirement spellings as posted; the skill score divides by their count
+        "skills": list(job_skills),
+        # Aligned with skills
+        "skill_names": [normalize_skill(skill) for skill in job_skills],
+        "experience": _lowered(job_experience),
+        "education": _lowered(job_education),
+        "employment_type": canonical_employment_type(job),
+    }
+
+
+def stored_features(job):
+    """The job's feature block if it is current, else None."""
+    features = job.get(FEATURES_FIELD)
+    if isinstance(features, dict) and features.get("version") == FEATURE_VERSION:
+        return features
+    return None
+
+
+def job_skill_ids(job, job_skills):
+    """Skill IDs aligned with job_skills (as returned by job_requirements), from the stored names when current."""
+    features = stored_features(job)
+    if features is not None:
+        return name_ids(features["skill_names"])
+    return normalize_many(job_skills)
+
+
+def job_features(job):
+    """Stored features when current, recomputed from the raw fields otherwise."""
+    return stored_features(job) or compute_features(job)
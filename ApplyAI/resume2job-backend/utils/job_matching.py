@@ -1,15 +1,25 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from difflib import get_close_matches
+from collections import namedtuple
+import heapq
+from utils.skill_taxonomy import normalize_skill, normalize_many
+from utils.fuzzy_skills import fuzzy_table
+from utils.job_features import job_skill_ids, raw_requirements, stored_features
 
-def tfidf_cosine_match(resume_text, job_listings, top_k=3):
-    job_texts = [job['description'] for job in job_listings]
-    docs = [resume_text] + job_texts
-    vectorizer = TfidfVectorizer().fit_transform(docs)
-    vectors = vectorizer.toarray()
-    resume_vec = vectors[0]
-    job_vecs = vectors[1:]
-    scores = cosine_similarity([resume_vec], job_vecs)[0]
+def tfidf_cosine_match(resume_text, job_listings, top_k=3, tfidf_index=None):
+    """
+    Top-k jobs by TF-IDF cosine similarity of their descriptions to the resume.
+    With a prebuilt TfidfJobIndex (utils.tfidf_index) the query is a transform plus a sparse dot product.
+    """
+    if tfidf_index is not None:
+        scores = tfidf_index.similarities_for(resume_text, job_listings)
+    else:
+        # sklearn takes over a second to import, so only when there is no prebuilt index
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import linear_kernel
+        job_texts = [job['description'] for job in job_listings]
+        docs = [resume_text] + job_texts
+        # Rows are L2-normalized, so the sparse dot product is the cosine similarity
+        vectors = TfidfVectorizer().fit_transform(docs)
+        scores = linear_kernel(vectors[0], vectors[1:]).ravel()
     top_indices = scores.argsort()[-top_k:][::-1]
     results = []
     for idx in top_indices:
@@ -20,299 +30,172 @@ def tfidf_cosine_match(resume_text, job_listings, top_k=3):
         })
     return results
 
-def normalize_skill(skill):
-    """Normalize skill name for better matching"""
-    if not skill:
-        return ""
-    # Convert to lowercase and remove extra spaces
-    normalized = skill.lower().strip()
-    # Handle common variations and aliases
-    variations = {
-        # Web basics
-        'html5': 'html',
-        'html 5': 'html',
-        'html': 'html',
-        'css3': 'css',
-        'css 3': 'css',
-        'css': 'css',
-        'scss': 'css',
-        'sass': 'css',
-        'less': 'css',
-        # JavaScript and variants
-        'javascript': 'javascript',
-        'java script': 'javascript',
-        'js': 'javascript',
-        'es6': 'javascript',
-        'es2015': 'javascript',
-        'typescript': 'typescript',
-        'ts': 'typescript',
-        # Frontend frameworks
-        'reactjs': 'react',
-        'react.js': 'react',
-        'react': 'react',
-        'nextjs': 'next.js',
-        'next.js': 'next.js',
-        'vuejs': 'vue',
-        'vue.js': 'vue',
-        'vue': 'vue',
-        'angularjs': 'angular',
-        'angular.js': 'angular',
-        'angular': 'angular',
-        'sveltejs': 'svelte',
-        'svelte.js': 'svelte',
-        'svelte': 'svelte',
-        # Backend frameworks
-        'nodejs': 'node.js',
-        'node.js': 'node.js',
-        'node': 'node.js',
-        'expressjs': 'express',
-        'express.js': 'express',
-        'express': 'express',
-        'fastapi': 'fastapi',
-        'flask': 'flask',
-        'django': 'django',
-        'springboot': 'spring boot',
-        'spring boot': 'spring boot',
-        # APIs
-        'restapi': 'rest api',
-        'rest api': 'rest api',
-        'restfulapi': 'rest api',
-        'restful api': 'rest api',
-        'graphql': 'graphql',
-        'soap': 'soap',
-        # Databases
-        'mongodb': 'mongodb',
-        'mongo db': 'mongodb',
-        'mongo': 'mongodb',
-        'postgresql': 'postgresql',
-        'postgres': 'postgresql',
-        'postgre': 'postgresql',
-        'mysql': 'mysql',
-        'sqlite': 'sqlite',
-        'redis': 'redis',
-        'dynamodb': 'dynamodb',
-        'cassandra': 'cassandra',
-        'nosql': 'nosql',
-        'sql': 'sql',
-        # Cloud & DevOps
-        'aws': 'aws',
-        'amazon web services': 'aws',
-        'gcp': 'gcp',
-        'google cloud': 'gcp',
-        'azure': 'azure',
-        'docker': 'docker',
-        'kubernetes': 'kubernetes',
-        'k8s': 'kubernetes',
-        'ci/cd': 'cicd',
-        'cicd': 'cicd',
-        'jenkins': 'jenkins',
-        'github actions': 'github actions',
-        'gitlab ci': 'gitlab ci',
-        # Programming languages
-        'python': 'python',
-        'py': 'python',
-        'java': 'java',
-        'c++': 'c++',
-        'cpp': 'c++',
-        'c#': 'c#',
-        'c sharp': 'c#',
-        'c': 'c',
-        'go': 'go',
-        'golang': 'go',
-        'ruby': 'ruby',
-        'php': 'php',
-        'swift': 'swift',
-        'objective-c': 'objective-c',
-        'objective c': 'objective-c',
-        'typescript': 'typescript',
-        # Data science & ML
-        'scikit-learn': 'scikit-learn',
-        'sklearn': 'scikit-learn',
-        'pandas': 'pandas',
-        'numpy': 'numpy',
-        'matplotlib': 'matplotlib',
-        'seaborn': 'seaborn',
-        'tensorflow': 'tensorflow',
-        'keras': 'keras',
-        'pytorch': 'pytorch',
-        'torch': 'pytorch',
-        'ml': 'machine learning',
-        'machine learning': 'machine learning',
-        'deep learning': 'deep learning',
-        'dl': 'deep learning',
-        'nlp': 'nlp',
-        'computer vision': 'computer vision',
-        # Tools
-        'git': 'git',
-        'github': 'git',
-        'gitlab': 'git',
-        'bitbucket': 'git',
-        'jira': 'jira',
-        'figma': 'figma',
-        'adobe xd': 'adobe xd',
-        # UI frameworks
-        'bootstrap': 'bootstrap',
-        'material ui': 'material ui',
-        'mui': 'material ui',
-        'tailwindcss': 'tailwind css',
-        'tailwind css': 'tailwind css',
-        'ant design': 'ant design',
-        'antd': 'ant design',
-        # Other common
-        'restful': 'rest api',
-        'oop': 'oop',
-        'object oriented programming': 'oop',
-        'agile': 'agile',
-        'scrum': 'scrum',
-        'kanban': 'kanban',
-        'jira': 'jira',
-        'trello': 'trello',
-        'notion': 'notion',
-        'slack': 'slack',
-        'firebase': 'firebase',
-        'heroku': 'heroku',
-        'vercel': 'vercel',
-        'netlify': 'netlify',
-        'webpack': 'webpack',
-        'babel': 'babel',
-        'vite': 'vite',
-        'parcel': 'parcel',
-        'eslint': 'eslint',
-        'prettier': 'prettier',
-        'storybook': 'storybook',
-        'threejs': 'three.js',
-        'three.js': 'three.js',
-        'framer motion': 'framer motion',
-        'motion': 'framer motion',
-        # Add more as needed
-    }
-    return variations.get(normalized, normalized)
+class ResumeProfile:
+    """
+    Resume-side matching state, built once per request and shared by every job scored:
+    prepared skill IDs, lowered experience/education text and a memo of fuzzy lookups.
+    """
 
-def skill_compatibility(resume_skills, job_skills):
-    if not job_skills:
+    def __init__(self, resume_skills, resume_experience=None, resume_education=None):
+        self.resume_skills = list(resume_skills or [])
+        self._fuzzy = fuzzy_table()
+        self.skills = self._fuzzy.prepare(self.resume_skills)
+        self.experience_text = _resume_text(resume_experience)
+        self.education_text = _resume_text(resume_education)
+        self._covered = {}
+
+    def covers(self, skill_id):
+        """True if the resume has the skill exactly or within the 0.8 fuzzy cutoff."""
+        covered = self._covered.get(skill_id)
+        if covered is None:
+            covered = skill_id in self.skills.ids or self._fuzzy.has_close_match(skill_id, self.skills)
+            self._covered[skill_id] = covered
+        return covered
+
+def _resume_text(resume_entries):
+    # Lowercase and flatten; None means there is nothing to match against
+    if not resume_entries:
+        return None
+    return ' '.join([str(e).lower() for e in resume_entries])
+
+def _keyword_score(resume_text, keywords):
+    """Simple overlap: percentage of keywords present in the resume text."""
+    if not keywords or resume_text is None:
         return 0.0
-    
-    # Normalize all skills
-    normalized_resume_skills = [normalize_skill(skill) for skill in resume_skills]
-    normalized_job_skills = [normalize_skill(skill) for skill in job_skills]
-    
-    # Find exact matches first
-    exact_matches = set(normalized_resume_skills) & set(normalized_job_skills)
-    
-    # Find fuzzy matches for remaining job skills
-    fuzzy_matches = set()
-    remaining_job_skills = set(normalized_job_skills) - exact_matches
-    
-    for job_skill in remaining_job_skills:
-        # Use fuzzy matching with 80% similarity threshold
-        close_matches = get_close_matches(job_skill, normalized_resume_skills, n=1, cutoff=0.8)
-        if close_matches:
-            fuzzy_matches.add(job_skill)
-    
-    # Combine exact and fuzzy matches
-    total_matches = len(exact_matches) + len(fuzzy_matches)
-    return round(total_matches / len(job_skills) * 100, 2)
+    matched = [kw for kw in keywords if kw.lower() in resume_text]
+    return round(len(matched) / len(keywords) * 100, 2)
+
+JobScore = namedtuple('JobScore', [
+    'compatibility', 'skill_score', 'exp_score', 'edu_score', 'matched_skills', 'missing_skills',
+])
+
+def score_job(profile, job_skills, job_experience=None, job_education=None, skill_ids=None):
+    """
+    Single-pass scoring kernel: skill, experience and education scores, the
+    weighted compatibility and the matched/missing skill lists for one job.
+    skill_ids (aligned with job_skills) skips normalizing the spellings.
+    """
+    matched_skills = []
+    missing_skills = []
+    skill_score = 0.0
+    if job_skills:
+        # Distinct skill IDs in first-seen order, mapped to the job's original spelling
+        if skill_ids is None:
+            skill_ids = normalize_many(job_skills)
+        job_mapping = dict(zip(skill_ids.tolist(), job_skills))
+        for job_skill, original in job_mapping.items():
+            if profile.covers(job_skill):
+                matched_skills.append(original)
+            else:
+                missing_skills.append(original)
+        skill_score = round(len(matched_skills) / len(job_skills) * 100, 2)
+    exp_score = _keyword_score(profile.experience_text, job_experience)
+    edu_score = _keyword_score(profile.education_text, job_education)
+    # Weights: skills 60%, experience 25%, education 15%
+    compatibility = round(0.6 * skill_score + 0.25 * exp_score + 0.15 * edu_score, 2)
+    return JobScore(compatibility, skill_score, exp_score, edu_score, matched_skills, missing_skills)
+
+def skill_compatibility(resume_skills, job_skills):
+    return score_job(ResumeProfile(resume_skills), job_skills).skill_score
 
 def get_matched_and_missing_skills(resume_skills, job_skills):
     """Get matched and missing skills with fuzzy matching"""
-    if not job_skills:
-        return [], []
-    
-    # Normalize all skills
-    normalized_resume_skills = [normalize_skill(skill) for skill in resume_skills]
-    normalized_job_skills = [normalize_skill(skill) for skill in job_skills]
-    
-    # Create mapping from normalized to original
-    resume_mapping = {normalize_skill(skill): skill for skill in resume_skills}
-    job_mapping = {normalize_skill(skill): skill for skill in job_skills}
-    
-    # Find exact matches
-    exact_matches = set(normalized_resume_skills) & set(normalized_job_skills)
-    matched_skills = [job_mapping[match] for match in exact_matches]
-    
-    # Find fuzzy matches for remaining job skills
-    remaining_job_skills = set(normalized_job_skills) - exact_matches
-    fuzzy_matched_job_skills = set()
-    
-    for job_skill in remaining_job_skills:
-        close_matches = get_close_matches(job_skill, normalized_resume_skills, n=1, cutoff=0.8)
-        if close_matches:
-            fuzzy_matched_job_skills.add(job_skill)
-            matched_skills.append(job_mapping[job_skill])
-    
-    # Find missing skills (job skills that don't have exact or fuzzy matches)
-    missing_normalized = remaining_job_skills - fuzzy_matched_job_skills
-    missing_skills = [job_mapping[skill] for skill in missing_normalized]
-    
-    return matched_skills, missing_skills
+    result = score_job(ResumeProfile(resume_skills), job_skills)
+    return result.matched_skills, result.missing_skills
 
 def experience_compatibility(resume_experience, job_experience):
     """
     Simple overlap: counts how many job experience keywords are present in resume experience entries.
     """
-    if not job_experience:
-        return 0.0
-    if not resume_experience:
-        return 0.0
-    # Lowercase and flatten
-    resume_exp_text = ' '.join([str(e).lower() for e in resume_experience])
-    matched = [kw for kw in job_experience if kw.lower() in resume_exp_text]
-    return round(len(matched) / len(job_experience) * 100, 2)
+    return _keyword_score(_resume_text(resume_experience), job_experience)
 
 def education_compatibility(resume_education, job_education):
     """
     Simple overlap: counts how many job education keywords are present in resume education entries.
     """
-    if not job_education:
-        return 0.0
-    if not resume_education:
-        return 0.0
-    resume_edu_text = ' '.join([str(e).lower() for e in resume_education])
-    matched = [kw for kw in job_education if kw.lower() in resume_edu_text]
-    return round(len(matched) / len(job_education) * 100, 2)
+    return _keyword_score(_resume_text(resume_education), job_education)
 
-def match_and_sort_jobs(resume_skills, job_listings, resume_experience=None, resume_education=None):
+def job_requirements(job):
+    """
+    Return (skills, experience, education) requirement lists of a job: the precomputed
+    feature block when current (utils.job_features), else the raw fields with fallbacks.
+    """
+    features = stored_features(job)
+    if features is not None:
+        return features['skills'], features['experience'], features['education']
+    return raw_requirements(job)
+
+def scored_job(job, compatibility, skill_score, exp_score, edu_score, matched_skills, missing_skills, **extra_fields):
+    """Create a new job object with all original fields plus the match scores."""
+    return {
+        **job,  # Include all original job fields
+        'compatibility': compatibility,
+        'skill_score': skill_score,
+        'exp_score': exp_score,
+        'edu_score': edu_score,
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills,
+        # Ensure these fields are included even if not in the original job
+        'recruiterId': job.get('recruiterId'),
+        'id': job.get('id') or job.get('job_id'),
+        'job_id': job.get('job_id') or job.get('id'),
+        **extra_fields,
+    }
+
+def blend_lexical(compatibility, tfidf_score, weight):
+    """Mix the TF-IDF description similarity (0-100) into a compatibility score."""
+    return round((1 - weight) * compatibility + weight * tfidf_score, 2)
+
+# Share of the TF-IDF description similarity blended into compatibility;
+# 0 only reports it as tfidf_score and keeps the skill/exp/edu ranking
+TFIDF_WEIGHT = 0.0
+
+# Catalogs at least this large are scored with the sparse matrix backend
+SPARSE_MATCH_MIN_JOBS = 200
+
+def match_and_sort_jobs(resume_skills, job_listings, resume_experience=None, resume_education=None, job_matrix=None, limit=None, offset=0,
+                        tfidf_index=None, resume_text=None, tfidf_weight=TFIDF_WEIGHT):
     """
     Returns job listings with a compatibility percentage, sorted descending.
     Uses weighted average of skills, experience, and education.
     Always includes matched_skills and missing_skills arrays.
     Preserves all original job fields including recruiterId.
+    Pass a prebuilt JobMatrix (utils.matching_engine) for job_listings to skip rebuilding it.
+    With limit, only the page [offset, offset + limit) of the ranking is selected and built.
+    With a TfidfJobIndex (utils.tfidf_index) and the resume text, each job also gets a
+    tfidf_score, blended into compatibility by tfidf_weight.
     """
-    jobs_with_scores = []
-    for job in job_listings:
+    if job_matrix is None and len(job_listings) >= SPARSE_MATCH_MIN_JOBS:
+        from utils.matching_engine import JobMatrix
+        job_matrix = JobMatrix(job_listings)
+    # Resume-side state is built once per request, not once per job
+    profile = ResumeProfile(resume_skills, resume_experience, resume_education)
+    lexical = None
+    if tfidf_index is not None and resume_text:
+        jobs = job_matrix.jobs if job_matrix is not None else job_listings
+        lexical = tfidf_index.similarities_for(resume_text, jobs)
+    if job_matrix is not None:
+        return job_matrix.match_and_sort(profile, limit=limit, offset=offset, lexical=lexical, lexical_weight=tfidf_weight)
+
+    results = []
+    extra_fields = []
+    for idx, job in enumerate(job_listings):
         # Extract required fields with fallbacks
-        job_skills = job.get('skills_required', []) or job.get('skills', [])
-        job_experience = job.get('experience_required', []) or job.get('experience', [])
-        job_education = job.get('education_required', []) or job.get('education', [])
-        
-        # Calculate compatibility scores
-        skill_score = skill_compatibility(resume_skills, job_skills)
-        exp_score = experience_compatibility(resume_experience, job_experience) if resume_experience is not None else 0.0
-        edu_score = education_compatibility(resume_education, job_education) if resume_education is not None else 0.0
-        
-        # Weights: skills 60%, experience 25%, education 15%
-        compatibility = round(0.6 * skill_score + 0.25 * exp_score + 0.15 * edu_score, 2)
-        
-        # Get matched and missing skills
-        matched_skills, missing_skills = get_matched_and_missing_skills(resume_skills, job_skills)
-        
-        # Create a new job object with all original fields plus the new ones
-        job_with_scores = {
-            **job,  # Include all original job fields
-            'compatibility': compatibility,
-            'skill_score': skill_score,
-            'exp_score': exp_score,
-            'edu_score': edu_score,
-            'matched_skills': matched_skills,
-            'missing_skills': missing_skills,
-            # Ensure these fields are included even if not in the original job
-            'recruiterId': job.get('recruiterId'),
-            'id': job.get('id') or job.get('job_id'),
-            'job_id': job.get('job_id') or job.get('id'),
-        }
-        
-        jobs_with_scores.append(job_with_scores)
+        job_skills, job_experience, job_education = job_requirements(job)
+        result = score_job(profile, job_skills, job_experience, job_education, job_skill_ids(job, job_skills))
+        if lexical is None:
+            extra_fields.append({})
+        else:
+            tfidf_score = round(float(lexical[idx]) * 100, 2)
+            if tfidf_weight:
+                result = result._replace(compatibility=blend_lexical(result.compatibility, tfidf_score, tfidf_weight))
+            extra_fields.append({'tfidf_score': tfidf_score})
+        results.append(result)
     
-    # Sort by compatibility score in descending order
-    sorted_jobs = sorted(jobs_with_scores, key=lambda x: x['compatibility'], reverse=True)
-    return sorted_jobs
\ No newline at end of file
+    # Sort by compatibility score in descending order, ties keep catalog order
+    key = lambda idx: (-results[idx].compatibility, idx)
+    if limit is None:
+        order = sorted(range(len(results)), key=key)[offset:]
+    else:
+        order = heapq.nsmallest(offset + limit, range(len(results)), key=key)[offset:]
+    return [scored_job(job_listings[idx], *results[idx], **extra_fields[idx]) for idx in order]
@@ -0,0 +1,70 @@
+"""
+Aho-Corasick multi-pattern matcher for the experience/education keyword scores.
+
+Built once from the union of a catalog's keywords; one pass over the lowered
+resume text yields the set of keywords that occur in it as substrings, the
+same test as `kw in text` for every keyword.
+"""
+
+
+class KeywordAutomaton:
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        # Trie transitions per state, failure links and keyword IDs ending at each state
+        goto = [{}]
+        outputs = [[]]
+        # The empty keyword is a substring of every text
+        self._always = [kid for kid, kw in enumerate(self.keywords) if not kw]
+        for kid, kw in enumerate(self.keywords):
+            if not kw:
+                continue
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(kid)
+
+        # Breadth-first failure links; each state also inherits the outputs of its failure state
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                if state:
+                    f = fail[state]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    fail[nxt] = goto[f].get(ch, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def find(self, text):
+        """Set of keyword IDs that occur in text."""
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        hits = set(self._always)
+        # A state's outputs only need collecting the first time it is reached
+        visited = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if state not in visited:
+                visited.add(state)
+                hits.update(outputs[state])
+        return hits
@@ -0,0 +1,335 @@
+"""
+Sparse matrix matching backend.
+
+Keeps the job catalog as CSR job x skill and job x keyword matrices so a
+resume is scored against every job with sparse mat-vecs instead of a Python
+loop over jobs. Scores are identical to job_matching.match_and_sort_jobs.
+"""
+from collections import namedtuple
+import os
+
+import numpy as np
+from scipy import sparse
+
+from utils.fuzzy_skills import fuzzy_table
+from utils.job_features import job_skill_ids
+from utils.job_matching import job_requirements, scored_job
+from utils.keyword_automaton import KeywordAutomaton
+from utils.skill_taxonomy import vocabulary_size
+
+# 'exact' scores every job; 'approximate' scores only IVF candidates (utils.ann)
+MATCH_MODE = os.environ.get('MATCH_MODE', 'exact')
+# Candidates retrieved per query in approximate mode
+ANN_CANDIDATES = int(os.environ.get('ANN_CANDIDATES', 2000))
+# Below this many jobs approximate mode is not worth it and falls back to exact
+ANN_MIN_JOBS = 20000
+# Worker processes for exact paged matching (utils.sharded_matching); 0 or 1 scores in-process
+MATCH_WORKERS = int(os.environ.get('MATCH_WORKERS', 0))
+# Smaller catalogs are scored in-process, the round trip to the workers costs more
+SHARDED_MIN_JOBS = 50000
+# Keyword vocabularies this large are matched with one Aho-Corasick pass
+# instead of a substring scan per keyword
+AUTOMATON_MIN_KEYWORDS = 256
+
+MatchScores = namedtuple('MatchScores', [
+    'compatibility', 'skill_score', 'exp_score', 'edu_score', 'exact_matches', 'covered', 'tfidf_score',
+], defaults=[None])
+
+
+def round2(values):
+    """Element-wise round(x, 2) with Python semantics (np.round differs on some halves)."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values
+    # Only a handful of distinct scores exist, so round those in Python
+    uniq, inverse = np.unique(values, return_inverse=True)
+    return np.array([round(v, 2) for v in uniq.tolist()], dtype=np.float64)[inverse]
+
+
+def percent(hits, totals):
+    """round(hits / totals * 100, 2) per job, 0.0 where the job has no requirements."""
+    out = np.zeros(len(totals), dtype=np.float64)
+    nonzero = totals > 0
+    out[nonzero] = round2(hits[nonzero] / totals[nonzero] * 100)
+    return out
+
+
+def weighted_compatibility(skill_score, exp_score, edu_score, lexical=None, lexical_weight=0.0):
+    """
+    (compatibility, tfidf_score) arrays from the per-job component scores;
+    tfidf_score is None without lexical similarities.
+    """
+    # Weights: skills 60%, experience 25%, education 15%
+    compatibility = round2(0.6 * skill_score + 0.25 * exp_score + 0.15 * edu_score)
+    tfidf_score = None
+    if lexical is not None:
+        tfidf_score = round2(lexical * 100)
+        if lexical_weight:
+            compatibility = round2((1 - lexical_weight) * compatibility + lexical_weight * tfidf_score)
+    return compatibility, tfidf_score
+
+
+def top_k_rows(scores, k):
+    """
+    Row indices of the k highest scores, descending, ties in row order
+    (the same order as a stable full sort), via argpartition.
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    negated = -scores
+    threshold = np.partition(negated, k - 1)[k - 1]
+    # Every row at or above the k-th score, including all ties at the boundary
+    candidates = np.flatnonzero(negated <= threshold)
+    return candidates[np.argsort(negated[candidates], kind='stable')][:k]
+
+
+class KeywordMatrix:
+    """Job x keyword count matrix for the experience/education substring scores."""
+
+    def __init__(self, keyword_lists):
+        vocab = {}
+        indptr = [0]
+        indices = []
+        data = []
+        for keywords in keyword_lists:
+            counts = {}
+            for kw in keywords:
+                col = vocab.setdefault(kw.lower(), len(vocab))
+                counts[col] = counts.get(col, 0) + 1
+            indices.extend(counts)
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        self.keywords = list(vocab)
+        self.totals = np.array([len(keywords) for keywords in keyword_lists], dtype=np.int64)
+        self.matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.int64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(keyword_lists), len(self.keywords)),
+        )
+        # Rebuilt together with the catalog, never per request
+        self.automaton = KeywordAutomaton(self.keywords) if len(self.keywords) >= AUTOMATON_MIN_KEYWORDS else None
+
+    def keyword_hits(self, resume_text):
+        """0/1 vector over the keyword vocabulary: keyword occurs in the lowered resume text."""
+        if self.automaton is not None:
+            hits = np.zeros(len(self.keywords), dtype=np.int64)
+            hits[list(self.automaton.find(resume_text))] = 1
+            return hits
+        return np.fromiter((kw in resume_text for kw in self.keywords), dtype=np.int64, count=len(self.keywords))
+
+    def percent(self, resume_text, rows=None):
+        totals = self.totals if rows is None else self.totals[rows]
+        if resume_text is None:
+            return np.zeros(len(totals), dtype=np.float64)
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        return percent(matrix @ self.keyword_hits(resume_text), totals)
+
+
+class JobMatrix:
+    """
+    A job catalog compiled into a CSR job x canonical-skill matrix.
+    Build once per catalog and reuse it across requests.
+    """
+
+    def __init__(self, job_listings):
+        self.jobs = list(job_listings)
+        indptr = [0]
+        indices = []
+        skill_totals = []
+        experience_lists = []
+        education_lists = []
+        # Original spelling of each stored (job, skill) entry, aligned with indices
+        self.skill_spellings = []
+        for job in self.jobs:
+            job_skills, job_experience, job_education = job_requirements(job)
+            # Distinct skill IDs in first-seen order, keeping the last spelling for each
+            spellings = dict(zip(job_skill_ids(job, job_skills).tolist(), job_skills))
+            indices.extend(spellings)
+            self.skill_spellings.extend(spellings.values())
+            indptr.append(len(indices))
+            skill_totals.append(len(job_skills))
+            experience_lists.append(job_experience)
+            education_lists.append(job_education)
+
+        self.n_skills = vocabulary_size()
+        self.skill_totals = np.array(skill_totals, dtype=np.int64)
+        self.skills = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(self.jobs), self.n_skills),
+        )
+        self.catalog_skills = np.unique(self.skills.indices).tolist()
+        # Bring the fuzzy neighbour table up to date with this catalog's skills
+        fuzzy_table().update()
+        self.experience = KeywordMatrix(experience_lists)
+        self.education = KeywordMatrix(education_lists)
+        self.ann = None
+        self._inverted = None
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def ann_features(self):
+        """
+        Per-job feature rows for the IVF index: skill, experience and education
+        columns scaled by weight / requirement count, so row . ann_query() is the
+        job's unrounded compatibility / 100.
+        """
+        blocks = []
+        for matrix, totals, weight in (
+            (self.skills, self.skill_totals, 0.6),
+            (self.experience.matrix, self.experience.totals, 0.25),
+            (self.education.matrix, self.education.totals, 0.15),
+        ):
+            scale = np.where(totals > 0, weight / np.maximum(totals, 1), 0.0)
+            blocks.append(sparse.diags(scale).dot(matrix))
+        return sparse.hstack(blocks, format='csr')
+
+    def ann_query(self, profile):
+        blocks = [self.covered_skills(profile)]
+        for keywords, resume_text in ((self.experience, profile.experience_text), (self.education, profile.education_text)):
+            if resume_text is None:
+                blocks.append(np.zeros(len(keywords.keywords), dtype=np.int64))
+            else:
+                blocks.append(keywords.keyword_hits(resume_text))
+        return np.concatenate(blocks)
+
+    def build_ann(self, **ivf_params):
+        """Build the IVF candidate index used by approximate mode."""
+        from utils.ann import IVFIndex
+        self.ann = IVFIndex(self.ann_features(), **ivf_params)
+        return self.ann
+
+    @property
+    def inverted(self):
+        """Term -> postings index over ann_features(), built on first use."""
+        if self._inverted is None:
+            from utils.inverted_index import InvertedSkillIndex
+            self._inverted = InvertedSkillIndex(self.ann_features())
+        return self._inverted
+
+    def pruned_rows(self, profile, k):
+        """
+        Rows that provably contain the exact top-k (inverted index + MaxScore
+        pruning), or None when the full scan is needed.
+        """
+        terms = np.flatnonzero(self.ann_query(profile))
+        return self.inverted.top_k_candidates(terms, k, lambda rows: self.score(profile, rows=rows).compatibility)
+
+    def candidate_rows(self, profile, n_candidates=None):
+        """Catalog rows retrieved by the IVF index for this resume, or None to score every job."""
+        if len(self.jobs) < ANN_MIN_JOBS and self.ann is None:
+            return None
+        if self.ann is None:
+            self.build_ann()
+        rows = self.ann.search(self.ann_query(profile), n_candidates or ANN_CANDIDATES)
+        # Nothing to retrieve by (e.g. no resume skills): fall back to the exact pass
+        return rows if len(rows) else None
+
+    def resume_skill_vector(self, profile):
+        """0/1 vector over skill IDs for the skills named in the resume."""
+        vector = np.zeros(self.n_skills, dtype=np.int64)
+        resume_ids = [sid for sid in profile.skills.ids if sid < self.n_skills]
+        vector[resume_ids] = 1
+        return vector
+
+    def covered_skills(self, profile):
+        """
+        0/1 vector over skill IDs: catalog skills the resume covers exactly or
+        within the 0.8 fuzzy cutoff.
+        """
+        covered = np.zeros(self.n_skills, dtype=np.int64)
+        if profile.resume_skills:
+            covered[[sid for sid in self.catalog_skills if profile.covers(sid)]] = 1
+        return covered
+
+    def score(self, profile, lexical=None, lexical_weight=0.0, rows=None):
+        """
+        Score every job in the catalog (or only the given rows) against a ResumeProfile;
+        returns MatchScores of per-job arrays aligned with rows.
+        lexical is an optional per-job TF-IDF cosine similarity, blended in by lexical_weight.
+        """
+        exact = self.resume_skill_vector(profile)
+        covered = self.covered_skills(profile)
+        skills = self.skills if rows is None else self.skills[rows]
+        skill_totals = self.skill_totals if rows is None else self.skill_totals[rows]
+        # One mat-vec for both exact and exact-or-fuzzy match counts
+        counts = skills @ np.column_stack((exact, covered))
+        skill_score = percent(counts[:, 1], skill_totals)
+        exp_score = self.experience.percent(profile.experience_text, rows)
+        edu_score = self.education.percent(profile.education_text, rows)
+        if lexical is not None and rows is not None:
+            lexical = lexical[rows]
+        compatibility, tfidf_score = weighted_compatibility(skill_score, exp_score, edu_score, lexical, lexical_weight)
+        return MatchScores(compatibility, skill_score, exp_score, edu_score, counts[:, 0], covered, tfidf_score)
+
+    def matched_and_missing(self, row, covered):
+        """Matched and missing skill spellings of one job, given the covered vector."""
+        matched_skills = []
+        missing_skills = []
+        start, end = self.skills.indptr[row], self.skills.indptr[row + 1]
+        for sid, spelling in zip(self.skills.indices[start:end].tolist(), self.skill_spellings[start:end]):
+            if covered[sid]:
+                matched_skills.append(spelling)
+            else:
+                missing_skills.append(spelling)
+        return matched_skills, missing_skills
+
+    def scored_job(self, row, scores, position=None):
+        """Result dict for catalog row; position indexes scores when they cover a subset of rows."""
+        position = row if position is None else position
+        matched_skills, missing_skills = self.matched_and_missing(row, scores.covered)
+        extra_fields = {} if scores.tfidf_score is None else {'tfidf_score': float(scores.tfidf_score[position])}
+        return scored_job(
+            self.jobs[row],
+            float(scores.compatibility[position]),
+            float(scores.skill_score[position]),
+            float(scores.exp_score[position]),
+            float(scores.edu_score[position]),
+            matched_skills,
+            missing_skills,
+            **extra_fields,
+        )
+
+    def rank(self, profile, k=None, lexical=None, lexical_weight=0.0, mode=None, n_candidates=None):
+        """
+        (rows, positions, scores) of the k best jobs, descending; all jobs when k is None.
+        rows are catalog rows, positions index into scores.
+        In exact mode a top-k only scores jobs from the inverted index that can still
+        make the cut; a blended lexical score has no per-term bound and scans every job.
+        With MATCH_WORKERS > 1, exact top-k on large catalogs is sharded across worker processes.
+        In approximate mode only IVF candidates are scored (exact scores, approximate recall).
+        """
+        rows = None
+        if k is not None:
+            if (mode or MATCH_MODE) != 'approximate' and MATCH_WORKERS > 1 and len(self.jobs) >= SHARDED_MIN_JOBS:
+                from utils.sharded_matching import default_matcher
+                return default_matcher().rank(self, profile, k, lexical, lexical_weight)
+            if (mode or MATCH_MODE) == 'approximate':
+                rows = self.candidate_rows(profile, n_candidates)
+            elif not lexical_weight:
+                rows = self.pruned_rows(profile, k)
+        scores = self.score(profile, lexical, lexical_weight, rows)
+        if k is None:
+            # Stable descending sort keeps catalog order for ties, like sorted(reverse=True)
+            positions = np.argsort(-scores.compatibility, kind='stable')
+        else:
+            positions = top_k_rows(scores.compatibility, k)
+        return (positions if rows is None else rows[positions]), positions, scores
+
+    def ranked_rows(self, profile, k=None, mode=None, n_candidates=None):
+        return self.rank(profile, k, mode=mode, n_candidates=n_candidates)[0]
+
+    def match_and_sort(self, profile, limit=None, offset=0, lexical=None, lexical_weight=0.0, mode=None, n_candidates=None):
+        """
+        Same output as job_matching.match_and_sort_jobs over this catalog.
+        With limit, only the page [offset, offset + limit) is selected and built.
+        mode ('exact' / 'approximate', default MATCH_MODE) picks the candidate stage for paged requests.
+        """
+        k = None if limit is None else offset + limit
+        rows, positions, scores = self.rank(profile, k, lexical, lexical_weight, mode, n_candidates)
+        return [
+            self.scored_job(row, scores, position)
+            for row, position in zip(rows[offset:].tolist(), positions[offset:].tolist())
+        ]
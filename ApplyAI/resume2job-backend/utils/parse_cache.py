@@ -0,0 +1,193 @@
+"""
+Content-addressed cache of parsed resumes.
+
+Candidates upload the same file over and over (retries, toggling use_llm,
+applying to several jobs), and each upload used to run the full Docling +
+PyMuPDF parse and the regex field extraction again. Entries are keyed by the
+SHA-256 of the uploaded bytes and the parser version, so a changed file or a
+parser upgrade is simply a miss. An in-memory LRU sits in front of a
+directory of JSON files shared by every worker on the host; both are bounded
+by size and evict the least recently used entries.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from utils.docling_utils import PARSER_VERSION
+
+PARSE_CACHE_DIR = os.environ.get("PARSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "resume2job-parse-cache"))
+PARSE_CACHE_MEMORY_MB = float(os.environ.get("PARSE_CACHE_MEMORY_MB", 64))
+PARSE_CACHE_DISK_MB = float(os.environ.get("PARSE_CACHE_DISK_MB", 1024))
+# Eviction trims the store to this fraction of its limit, so it does not run on every write
+EVICT_TO = 0.9
+
+
+def parser_version():
+    """PARSER_VERSION plus the installed Docling release, which changes the markdown too."""
+    from importlib import metadata
+    try:
+        return f"{PARSER_VERSION}/docling-{metadata.version('docling')}"
+    except metadata.PackageNotFoundError:
+        return PARSER_VERSION
+
+
+class ParseCache:
+    def __init__(self, directory=PARSE_CACHE_DIR, memory_bytes=int(PARSE_CACHE_MEMORY_MB * 2**20),
+                 disk_bytes=int(PARSE_CACHE_DISK_MB * 2**20), version=None):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._version = version
+        self._lock = threading.Lock()
+        # key -> encoded entry, least recently used first; decoded per hit so callers
+        # can modify what they get back
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        # Bytes on disk, counted on first use and kept up to date by this process
+        self._disk_used = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.disk_errors = 0
+
+    @property
+    def version(self):
+        if self._version is None:
+            self._version = parser_version()
+        return self._version
+
+    def key(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        return hashlib.sha256(f"{digest}:{self.version}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, content):
+        """The cached entry for these uploaded bytes, or None. Blocking (hashes and may read disk)."""
+        key = self.key(content)
+        with self._lock:
+            raw = self._memory.get(key)
+            if raw is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+        if raw is not None:
+            return json.loads(raw)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            entry = json.loads(raw)
+            # The file's mtime is its recency for disk eviction
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[ParseCache] Unreadable entry {path}: {e}")
+            with self._lock:
+                self.disk_errors += 1
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, raw)
+        return entry
+
+    def put(self, content, entry):
+        """Store entry (a JSON-serialisable dict) for these uploaded bytes. Blocking."""
+        key = self.key(content)
+        raw = json.dumps(entry).encode()
+        with self._lock:
+            self._remember(key, raw)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written to a temp file and renamed, so other workers never read half an entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(raw)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[ParseCache] Could not write {path}: {e}")
+            with self._lock:
+                self.disk_errors += 1
+            return
+        self._grow_disk(len(raw) - previous)
+
+    def _remember(self, key, raw):
+        # Callers hold self._lock
+        if len(raw) > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_used -= len(self._memory.pop(key))
+        self._memory[key] = raw
+        self._memory_used += len(raw)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self.memory_evictions += 1
+
+    def _entries(self):
+        """(mtime, size, path) of every entry on disk."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _grow_disk(self, delta):
+        with self._lock:
+            if self._disk_used is None:
+                self._disk_used = sum(size for _, size, _ in self._entries())
+            else:
+                self._disk_used += delta
+            if self._disk_used <= self.disk_bytes:
+                return
+            # Other workers write to the same directory, so recount from what is actually there
+            entries = sorted(self._entries())
+            used = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if used <= self.disk_bytes * EVICT_TO:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                used -= size
+                self.disk_evictions += 1
+            self._disk_used = used
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "parser_version": self._version,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_bytes": self._disk_used,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "disk_errors": self.disk_errors,
+            }
+
+
+# Process-wide cache used by the routes
+parse_cache = ParseCache()
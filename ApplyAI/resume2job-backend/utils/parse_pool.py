@@ -0,0 +1,195 @@
+"""
+Resume parsing off the event loop, in a pool of worker processes.
+
+A Docling conversion holds the CPU (and the GIL) for seconds, so async
+routes hand parse_resume to ParsePool.parse instead of calling it inline.
+At most PARSE_WORKERS parses run at once and PARSE_QUEUE_SIZE more may wait;
+beyond that parse() raises ParseQueueFull at once, with a Retry-After
+estimate, so a burst of uploads gets fast 503s instead of an ever-growing
+backlog. Each worker builds its own warm converter pool (utils/docling_utils)
+when it starts. metrics() reports queue depth and wait / parse times, and
+how many documents took the PyMuPDF fast path or went through Docling.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import math
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+
+from utils.docling_utils import converter_pool, parse_resume
+
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", 1))
+# Parses allowed to wait for a worker before new ones are turned away
+PARSE_QUEUE_SIZE = int(os.environ.get("PARSE_QUEUE_SIZE", 8))
+# Recent parses kept for the wait / parse time percentiles
+METRIC_WINDOW = 500
+# Assumed parse time before any parse has finished, for Retry-After
+DEFAULT_PARSE_SECONDS = 5.0
+
+
+class ParseQueueFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Resume parsing is at capacity, retry in {retry_after} s")
+        self.retry_after = retry_after
+
+
+def _init_worker():
+    # Build this worker's converters before it takes its first job
+    try:
+        converter_pool.warm()
+    except Exception as e:
+        print(f"[ParsePool] Warming converters failed in worker {os.getpid()}: {e}")
+
+
+def _parse(content, filename, high_fidelity, submitted_at):
+    # Wall clock, comparable across processes
+    wait = time.time() - submitted_at
+    start = time.perf_counter()
+    result = parse_resume(content, filename, high_fidelity)
+    seconds = time.perf_counter() - start
+    print(f"[ParsePool] {filename}: {result.path} path, text quality {result.quality}, {seconds:.2f} s")
+    return wait, seconds, result
+
+
+def _worker_health():
+    return os.getpid(), converter_pool.health()
+
+
+def _percentiles(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        "p50": round(statistics.median(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class ParsePool:
+    def __init__(self, workers=PARSE_WORKERS, max_queue=PARSE_QUEUE_SIZE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._waits = deque(maxlen=METRIC_WINDOW)
+        self._durations = deque(maxlen=METRIC_WINDOW)
+        # parse_resume path ("pymupdf" / "docling") -> (documents, recent parse seconds)
+        self._paths = {}
+        self._qualities = deque(maxlen=METRIC_WINDOW)
+        self._worker_health = {}
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the parent has gRPC / listener threads running
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker
+                )
+            return self._executor
+
+    def _discard(self, executor):
+        # A worker died (e.g. out of memory) and broke the pool; the next parse starts a fresh one
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def warm(self):
+        """Start the worker processes and wait until each has built its converters. Blocking."""
+        executor = self._pool()
+        for pid, health in [future.result() for future in [executor.submit(_worker_health) for _ in range(self.workers)]]:
+            self._worker_health[pid] = health
+        unhealthy = [health["create_error"] for health in self._worker_health.values() if not health["healthy"]]
+        if unhealthy:
+            raise RuntimeError(f"Parse workers cannot build converters: {unhealthy[0]}")
+
+    def retry_after(self):
+        """Seconds until a queue slot is likely to free up, from the recent mean parse time."""
+        mean = statistics.mean(self._durations) if self._durations else DEFAULT_PARSE_SECONDS
+        waiting = max(self.in_flight - self.workers, 0) + 1
+        return max(1, math.ceil(mean * waiting / self.workers))
+
+    async def parse(self, content, filename, high_fidelity=False):
+        """parse_resume(...) in a worker; raises ParseQueueFull when every worker and queue slot is taken."""
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ParseQueueFull(self.retry_after())
+            self.in_flight += 1
+            self.submitted += 1
+        submitted_at = time.time()
+        executor = self._pool()
+        try:
+            # The upload's bytes go to the worker over its pipe, not through a temp file
+            future = executor.submit(_parse, content, filename, high_fidelity, submitted_at)
+        except BrokenProcessPool:
+            self._discard(executor)
+            self._finished(None, submitted_at)
+            raise
+        # Counted as in flight until the worker is done, even if this request is cancelled meanwhile
+        future.add_done_callback(lambda future: self._finished(future, submitted_at))
+        try:
+            _, _, result = await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+        return result
+
+    def _finished(self, future, submitted_at):
+        with self._lock:
+            self.in_flight -= 1
+            if future is None or future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+            wait, seconds, result = future.result()
+            self.completed += 1
+            self._waits.append(wait)
+            self._durations.append(seconds)
+            self._qualities.append(result.quality)
+            documents, durations = self._paths.setdefault(result.path, (0, deque(maxlen=METRIC_WINDOW)))
+            durations.append(seconds)
+            self._paths[result.path] = (documents + 1, durations)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                # Submitted parses no worker has picked up yet
+                "queue_depth": max(self.in_flight - self.workers, 0),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "wait_seconds": _percentiles(self._waits),
+                "parse_seconds": _percentiles(self._durations),
+                # Documents and parse time per path, and text layer quality scores
+                "paths": {
+                    path: {"documents": documents, "parse_seconds": _percentiles(durations)}
+                    for path, (documents, durations) in self._paths.items()
+                },
+                "text_quality": _percentiles(self._qualities),
+                "worker_converters": dict(self._worker_health),
+            }
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Process-wide pool used by the routes
+parse_pool = ParsePool()
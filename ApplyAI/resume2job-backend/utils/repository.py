@@ -0,0 +1,175 @@
+"""
+Storage interface for the API routes.
+
+Routes talk to a Repository instead of a Firestore client, so the service can
+run on another store: FirestoreRepository (utils/firestore_repository.py) is
+the production backend, SqliteRepository (utils/sqlite_repository.py) a
+single-file one for load tests, CI benchmarks and small single-node setups.
+STORAGE_BACKEND picks one at startup ("firestore" by default, or "sqlite"
+with the database at SQLITE_PATH).
+
+Conventions shared by the backends:
+- documents are plain dicts; IDs come from new_id() and are passed to writes
+- list methods return a Page of (id, data) pairs in a stable order plus the
+  opaque cursor for the next page (None on the last page or when page_size is
+  not set); a malformed start_after raises ValueError
+- fields projects listed documents to those fields
+- writes that belong together (an application and its counters) are atomic
+"""
+from abc import ABC, abstractmethod
+from collections import namedtuple
+import os
+
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "firestore")
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "resume2job.db")
+
+Page = namedtuple('Page', ['items', 'next_start_after'])
+
+
+class Repository(ABC):
+    @abstractmethod
+    def new_id(self, collection):
+        """A fresh document ID for collection. No I/O."""
+        raise NotImplementedError
+
+    def job_catalog(self, tfidf_index=None):
+        """A started (not necessarily loaded) JobCatalog following the jobs collection, or None."""
+        return None
+
+    def close(self):
+        pass
+
+    # Users
+
+    @abstractmethod
+    async def get_user(self, uid, fields=None):
+        """The user document, or None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_users(self, uids, fields=None):
+        """{uid: data} for the users that exist, in one round trip."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_user(self, uid, data, merge=False):
+        raise NotImplementedError
+
+    # Recruiters
+
+    @abstractmethod
+    async def get_recruiter(self, recruiter_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_recruiter(self, recruiter_id, data):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_recruiter(self, recruiter_id, data):
+        """Merge data into an existing recruiter; raises if there is none."""
+        raise NotImplementedError
+
+    # Jobs
+
+    @abstractmethod
+    async def get_job(self, job_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_job(self, job_id, data):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_jobs(self, recruiter_id, page_size=None, start_after=None, fields=None):
+        """Page of the recruiter's jobs in ID order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def all_jobs(self):
+        """Every job as a listing for matching (see firebase_utils.job_from_doc), in ID order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def applicant_summary(self, recruiter_id):
+        """[{"jobId", "title", "total", "byStatus"}] for the recruiter's jobs, from the per-job counters."""
+        raise NotImplementedError
+
+    # Applicants (JSON /job/apply)
+
+    @abstractmethod
+    async def add_applicant(self, applicant_id, data):
+        """Store an applicant and count it on its job."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_applicants(self, job_id, page_size=None, start_after=None, fields=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_applicant_status(self, applicant_id, new_status):
+        """Change the status and the job's per-status counters together. False if there is no such applicant."""
+        raise NotImplementedError
+
+    # Applications (multipart /job/apply)
+
+    @abstractmethod
+    async def get_application(self, application_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_application(self, application_id, data):
+        """
+        Store an application together with the job's applicants entry, the candidate's
+        per-job application state and the job's counters. Fails if the job does not exist.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_applications(self, job_id, page_size=None, start_after=None, fields=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_application(self, application_id, application, updates):
+        """
+        Apply updates to an application read as application. When they change the
+        status, the candidate's copy and the job's counters change in the same transaction.
+        """
+        raise NotImplementedError
+
+    # Messages
+
+    @abstractmethod
+    async def add_message(self, message_id, data):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_messages(self, messages):
+        """Store many (id, data) messages; one entry per message, None if stored else the error."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_messages(self, job_id, recruiter_id, applicant_id, page_size=None, start_after=None, fields=None):
+        """Page of one conversation in timestamp order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_bulk_message_job(self, bulk_job_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_bulk_message_job(self, bulk_job_id, data, merge=False):
+        raise NotImplementedError
+
+
+def open_repository(backend=STORAGE_BACKEND):
+    """The configured backend; imported lazily so SQLite deployments need no Firebase credentials."""
+    if backend == "sqlite":
+        from utils.sqlite_repository import SqliteRepository
+        return SqliteRepository(SQLITE_PATH)
+    if backend == "firestore":
+        from utils.firestore_repository import FirestoreRepository
+        from utils.firebase_utils import init_firebase
+        # Collections are created by `python manage.py ensure-collections`, not on every start
+        return FirestoreRepository(init_firebase())
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}")
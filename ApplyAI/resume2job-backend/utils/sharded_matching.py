@@ -0,0 +1,193 @@
+"""
+Multi-process exact matching over a job catalog held in shared memory.
+
+The scoring arrays of a JobMatrix (skill and keyword CSR matrices plus
+requirement counts) are copied once into multiprocessing.shared_memory
+blocks, which worker processes map without copying. The request process
+works out the resume side once (fuzzy skill coverage, keyword hits), each
+worker scores a contiguous shard of job rows and returns its local top-k,
+and the request process merges them. Ranking and scores are identical to
+the in-process JobMatrix.rank.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import shared_memory
+import threading
+import weakref
+
+import numpy as np
+from scipy import sparse
+
+from utils.matching_engine import MATCH_WORKERS, percent, top_k_rows, weighted_compatibility
+
+# Shared catalogs a worker keeps mapped: the current one and the one it replaces
+WORKER_CATALOGS = 2
+
+
+def _release(blocks):
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+class SharedCatalog:
+    """The scoring arrays of one JobMatrix, copied into shared memory blocks."""
+
+    def __init__(self, job_matrix):
+        self.n_rows = len(job_matrix)
+        blocks = []
+        layout = {}
+        for part, matrix, totals in (
+            ('skills', job_matrix.skills, job_matrix.skill_totals),
+            ('experience', job_matrix.experience.matrix, job_matrix.experience.totals),
+            ('education', job_matrix.education.matrix, job_matrix.education.totals),
+        ):
+            fields = {}
+            for field, array in (('indptr', matrix.indptr), ('indices', matrix.indices), ('data', matrix.data), ('totals', totals)):
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+                blocks.append(block)
+                fields[field] = (block.name, array.shape, array.dtype.str)
+            layout[part] = (matrix.shape[1], fields)
+        # Picklable description the workers attach by; the first block name identifies the catalog
+        self.spec = (blocks[0].name, layout)
+        # Blocks are unlinked once the catalog is closed or garbage collected
+        self._finalizer = weakref.finalize(self, _release, blocks)
+
+    def close(self):
+        self._finalizer()
+
+
+# Worker side: catalogs attached in this process, oldest first
+_attached = {}
+
+
+def _attach(spec):
+    key, layout = spec
+    if key in _attached:
+        return _attached[key][1]
+    while len(_attached) >= WORKER_CATALOGS:
+        blocks, parts = _attached.pop(next(iter(_attached)))
+        # Views into the buffers must go before the blocks can be closed
+        parts.clear()
+        for block in blocks:
+            block.close()
+    blocks = []
+    parts = {}
+    for part, (n_cols, fields) in layout.items():
+        arrays = {}
+        for field, (name, shape, dtype) in fields.items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            arrays[field] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        parts[part] = (n_cols, arrays)
+    _attached[key] = (blocks, parts)
+    return parts
+
+
+def _shard_percent(part, start, end, hit_ids):
+    """Percent of a part's requirements met by hit_ids for rows [start, end); 0 when hit_ids is None."""
+    n_cols, arrays = part
+    totals = arrays['totals'][start:end]
+    if hit_ids is None:
+        return np.zeros(len(totals), dtype=np.float64)
+    indptr = arrays['indptr'][start:end + 1]
+    lo, hi = indptr[0], indptr[-1]
+    matrix = sparse.csr_matrix((arrays['data'][lo:hi], arrays['indices'][lo:hi], indptr - lo), shape=(end - start, n_cols))
+    hits = np.zeros(n_cols, dtype=np.int64)
+    hits[hit_ids] = 1
+    return percent(matrix @ hits, totals)
+
+
+def _score_shard(spec, start, end, query, k):
+    """Global rows and compatibility of the local top-k of rows [start, end)."""
+    parts = _attach(spec)
+    covered_ids, experience_ids, education_ids, lexical, lexical_weight = query
+    compatibility, _ = weighted_compatibility(
+        _shard_percent(parts['skills'], start, end, covered_ids),
+        _shard_percent(parts['experience'], start, end, experience_ids),
+        _shard_percent(parts['education'], start, end, education_ids),
+        lexical,
+        lexical_weight,
+    )
+    best = top_k_rows(compatibility, k)
+    return best + start, compatibility[best]
+
+
+class ShardedMatcher:
+    """
+    Process pool scoring shards of shared catalogs. One matcher serves any
+    number of JobMatrix catalogs; each is copied to shared memory on first use.
+    """
+
+    def __init__(self, n_workers=None, n_shards=None):
+        self.n_workers = n_workers or MATCH_WORKERS or multiprocessing.cpu_count()
+        self.n_shards = n_shards or self.n_workers
+        # spawn: the request process may hold threads and Firestore connections
+        self.executor = ProcessPoolExecutor(self.n_workers, mp_context=multiprocessing.get_context('spawn'))
+        self._catalogs = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def share(self, job_matrix):
+        with self._lock:
+            catalog = self._catalogs.get(job_matrix)
+            if catalog is None:
+                catalog = self._catalogs[job_matrix] = SharedCatalog(job_matrix)
+            return catalog
+
+    def shard_bounds(self, n_rows):
+        edges = np.linspace(0, n_rows, min(self.n_shards, max(n_rows, 1)) + 1).astype(np.int64)
+        return [(start, end) for start, end in zip(edges[:-1].tolist(), edges[1:].tolist()) if end > start]
+
+    def rank(self, job_matrix, profile, k, lexical=None, lexical_weight=0.0):
+        """
+        Same (rows, positions, scores) as job_matrix.rank(profile, k, ...) in exact mode.
+        Blocks until every shard is scored; async routes call it from a thread
+        (asyncio.to_thread), so the event loop keeps serving while workers score.
+        """
+        catalog = self.share(job_matrix)
+        covered_ids = np.flatnonzero(job_matrix.covered_skills(profile))
+        keyword_ids = [
+            None if resume_text is None else np.flatnonzero(keywords.keyword_hits(resume_text))
+            for keywords, resume_text in (
+                (job_matrix.experience, profile.experience_text),
+                (job_matrix.education, profile.education_text),
+            )
+        ]
+        futures = [
+            self.executor.submit(
+                _score_shard, catalog.spec, start, end,
+                (covered_ids, *keyword_ids, None if lexical is None else lexical[start:end], lexical_weight), k,
+            )
+            for start, end in self.shard_bounds(catalog.n_rows)
+        ]
+        results = [future.result() for future in futures]
+        rows = np.concatenate([rows for rows, _ in results]) if results else np.empty(0, dtype=np.int64)
+        compatibility = np.concatenate([scores for _, scores in results]) if results else np.empty(0)
+        # Back to catalog order so ties in the merge break by row, like a stable full sort
+        order = np.argsort(rows, kind='stable')
+        rows = rows[order][top_k_rows(compatibility[order], k)]
+        # Full component scores only for the merged top-k
+        scores = job_matrix.score(profile, lexical, lexical_weight, rows)
+        return rows, np.arange(len(rows)), scores
+
+    def close(self):
+        self.executor.shutdown()
+        with self._lock:
+            for catalog in list(self._catalogs.values()):
+                catalog.close()
+            self._catalogs.clear()
+
+
+_default_matcher = None
+_default_lock = threading.Lock()
+
+
+def default_matcher():
+    """Process-wide matcher with MATCH_WORKERS workers, started on first use."""
+    global _default_matcher
+    with _default_lock:
+        if _default_matcher is None:
+            _default_matcher = ShardedMatcher()
+        return _default_matcher
@@ -0,0 +1,244 @@
+"""
+Skill taxonomy compiled once at import time.
+
+Holds the alias table used to normalize skill names, the list of canonical
+skills and a dense integer ID for every skill name seen by the matcher, so
+the hot matching paths compare ints instead of re-normalizing strings.
+"""
+import threading
+
+# Alias -> canonical skill name
+SKILL_ALIASES = {
+    # Web basics
+    'html5': 'html',
+    'html 5': 'html',
+    'html': 'html',
+    'css3': 'css',
+    'css 3': 'css',
+    'css': 'css',
+    'scss': 'css',
+    'sass': 'css',
+    'less': 'css',
+    # JavaScript and variants
+    'javascript': 'javascript',
+    'java script': 'javascript',
+    'js': 'javascript',
+    'es6': 'javascript',
+    'es2015': 'javascript',
+    'typescript': 'typescript',
+    'ts': 'typescript',
+    # Frontend frameworks
+    'reactjs': 'react',
+    'react.js': 'react',
+    'react': 'react',
+    'nextjs': 'next.js',
+    'next.js': 'next.js',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'vue': 'vue',
+    'angularjs': 'angular',
+    'angular.js': 'angular',
+    'angular': 'angular',
+    'sveltejs': 'svelte',
+    'svelte.js': 'svelte',
+    'svelte': 'svelte',
+    # Backend frameworks
+    'nodejs': 'node.js',
+    'node.js': 'node.js',
+    'node': 'node.js',
+    'expressjs': 'express',
+    'express.js': 'express',
+    'express': 'express',
+    'fastapi': 'fastapi',
+    'flask': 'flask',
+    'django': 'django',
+    'springboot': 'spring boot',
+    'spring boot': 'spring boot',
+    # APIs
+    'restapi': 'rest api',
+    'rest api': 'rest api',
+    'restfulapi': 'rest api',
+    'restful api': 'rest api',
+    'graphql': 'graphql',
+    'soap': 'soap',
+    # Databases
+    'mongodb': 'mongodb',
+    'mongo db': 'mongodb',
+    'mongo': 'mongodb',
+    'postgresql': 'postgresql',
+    'postgres': 'postgresql',
+    'postgre': 'postgresql',
+    'mysql': 'mysql',
+    'sqlite': 'sqlite',
+    'redis': 'redis',
+    'dynamodb': 'dynamodb',
+    'cassandra': 'cassandra',
+    'nosql': 'nosql',
+    'sql': 'sql',
+    # Cloud & DevOps
+    'aws': 'aws',
+    'amazon web services': 'aws',
+    'gcp': 'gcp',
+    'google cloud': 'gcp',
+    'azure': 'azure',
+    'docker': 'docker',
+    'kubernetes': 'kubernetes',
+    'k8s': 'kubernetes',
+    'ci/cd': 'cicd',
+    'cicd': 'cicd',
+    'jenkins': 'jenkins',
+    'github actions': 'github actions',
+    'gitlab ci': 'gitlab ci',
+    # Programming languages
+    'python': 'python',
+    'py': 'python',
+    'java': 'java',
+    'c++': 'c++',
+    'cpp': 'c++',
+    'c#': 'c#',
+    'c sharp': 'c#',
+    'c': 'c',
+    'go': 'go',
+    'golang': 'go',
+    'ruby': 'ruby',
+    'php': 'php',
+    'swift': 'swift',
+    'objective-c': 'objective-c',
+    'objective c': 'objective-c',
+    # Data science & ML
+    'scikit-learn': 'scikit-learn',
+    'sklearn': 'scikit-learn',
+    'pandas': 'pandas',
+    'numpy': 'numpy',
+    'matplotlib': 'matplotlib',
+    'seaborn': 'seaborn',
+    'tensorflow': 'tensorflow',
+    'keras': 'keras',
+    'pytorch': 'pytorch',
+    'torch': 'pytorch',
+    'ml': 'machine learning',
+    'machine learning': 'machine learning',
+    'deep learning': 'deep learning',
+    'dl': 'deep learning',
+    'nlp': 'nlp',
+    'computer vision': 'computer vision',
+    # Tools
+    'git': 'git',
+    'github': 'git',
+    'gitlab': 'git',
+    'bitbucket': 'git',
+    'jira': 'jira',
+    'figma': 'figma',
+    'adobe xd': 'adobe xd',
+    # UI frameworks
+    'bootstrap': 'bootstrap',
+    'material ui': 'material ui',
+    'mui': 'material ui',
+    'tailwindcss': 'tailwind css',
+    'tailwind css': 'tailwind css',
+    'ant design': 'ant design',
+    'antd': 'ant design',
+    # Other common
+    'restful': 'rest api',
+    'oop': 'oop',
+    'object oriented programming': 'oop',
+    'agile': 'agile',
+    'scrum': 'scrum',
+    'kanban': 'kanban',
+    'trello': 'trello',
+    'notion': 'notion',
+    'slack': 'slack',
+    'firebase': 'firebase',
+    'heroku': 'heroku',
+    'vercel': 'vercel',
+    'netlify': 'netlify',
+    'webpack': 'webpack',
+    'babel': 'babel',
+    'vite': 'vite',
+    'parcel': 'parcel',
+    'eslint': 'eslint',
+    'prettier': 'prettier',
+    'storybook': 'storybook',
+    'threejs': 'three.js',
+    'three.js': 'three.js',
+    'framer motion': 'framer motion',
+    'motion': 'framer motion',
+    # Add more as needed
+}
+
+# Canonical skills get the first, stable block of IDs (0 .. len - 1)
+CANONICAL_SKILLS = tuple(dict.fromkeys(SKILL_ALIASES.values()))
+
+_lock = threading.Lock()
+_names = list(CANONICAL_SKILLS)
+_ids = {name: idx for idx, name in enumerate(_names)}
+# Raw (un-normalized) spelling -> ID, filled as spellings are resolved
+_raw_ids = {}
+
+UNKNOWN_SKILL_ID = -1
+
+
+def normalize_skill(skill):
+    """Normalize skill name for better matching"""
+    if not skill:
+        return ""
+    normalized = skill.lower().strip()
+    return SKILL_ALIASES.get(normalized, normalized)
+
+
+def skill_id(skill, intern=True):
+    """
+    Return the dense ID for a raw skill spelling.
+    Skills outside the taxonomy are interned on first sight (job side) or, with
+    intern=False, reported as UNKNOWN_SKILL_ID so arbitrary resume tokens do not
+    grow the vocabulary.
+    """
+    raw = skill or ""
+    cached = _raw_ids.get(raw)
+    if cached is not None:
+        return cached
+    name = normalize_skill(raw)
+    idx = _ids.get(name)
+    if idx is None:
+        if not intern:
+            return UNKNOWN_SKILL_ID
+        idx = _intern(name)
+    _raw_ids[raw] = idx
+    return idx
+
+
+def _intern(name):
+    with _lock:
+        idx = _ids.get(name)
+        if idx is None:
+            idx = len(_names)
+            _names.append(name)
+            _ids[name] = idx
+    return idx
+
+
+def normalize_many(skills, intern=True):
+    """Batch version of skill_id: returns an int32 array of skill IDs."""
+    # numpy is only needed once matching starts, not to import the app
+    import numpy as np
+    if not skills:
+        return np.empty(0, dtype=np.int32)
+    return np.fromiter((skill_id(s, intern) for s in skills), dtype=np.int32, count=len(skills))
+
+
+def name_ids(names):
+    """IDs for names already passed through normalize_skill (precomputed job features), interned on first sight."""
+    import numpy as np
+    if not names:
+        return np.empty(0, dtype=np.int32)
+    return np.fromiter((_ids.get(name) if name in _ids else _intern(name) for name in names), dtype=np.int32, count=len(names))
+
+
+def skill_name(idx):
+    """Canonical name for a skill ID."""
+    return _names[idx]
+
+
+def vocabulary_size():
+    """Number of interned skill IDs (canonical skills plus interned extras)."""
+    return len(_names)
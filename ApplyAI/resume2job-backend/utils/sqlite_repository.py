@@ -0,0 +1,434 @@
+"""
+Repository on a local SQLite file, for load tests, CI benchmarks and single-node deployments.
+
+Documents are stored as JSON next to copies of the fields the routes filter
+and order on, and every list query is a range scan of an index on those
+columns, paged by keyset (the same opaque cursors as Firestore). The database
+runs in WAL mode so readers never wait for the writer; each pool thread keeps
+its own connection and calls are awaited like AsyncFirestore's. Writes that
+touch several documents run as one transaction.
+
+Every job write stamps the row with the next value of a per-table change
+sequence. Each process's job catalog polls for rows past the last sequence
+it has seen (CATALOG_POLL_SECONDS), so it also follows jobs written by the
+other uvicorn workers on the same file, and no request waits for a catalog
+rebuild.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import enum
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+from utils.applicant_stats import status_key
+from utils.firebase_utils import job_from_doc
+from utils.firestore_paging import decode_cursor, encode_cursor
+from utils.repository import Page, Repository
+
+SQLITE_THREADS = int(os.environ.get("SQLITE_THREADS", 4))
+# How often the job catalog checks the jobs table for rows written since its last look
+CATALOG_POLL_SECONDS = float(os.environ.get("CATALOG_POLL_SECONDS", 1.0))
+# Bound parameters per IN (...) lookup
+SQLITE_IN_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS recruiters (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, recruiter_id TEXT, data TEXT NOT NULL, seq INTEGER);
+CREATE INDEX IF NOT EXISTS jobs_recruiter ON jobs (recruiter_id, id);
+CREATE TABLE IF NOT EXISTS applicants (id TEXT PRIMARY KEY, job_id TEXT, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS applicants_job ON applicants (job_id, id);
+CREATE TABLE IF NOT EXISTS applications (id TEXT PRIMARY KEY, job_id TEXT, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS applications_job ON applications (job_id, id);
+CREATE TABLE IF NOT EXISTS user_applications (
+    uid TEXT NOT NULL, job_id TEXT NOT NULL, status TEXT, applied_at TEXT, PRIMARY KEY (uid, job_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY, job_id TEXT, recruiter_id TEXT, applicant_id TEXT, timestamp TEXT, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_conversation ON messages (job_id, recruiter_id, applicant_id, timestamp, id);
+CREATE TABLE IF NOT EXISTS bulk_message_jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS job_applicant_stats (
+    job_id TEXT NOT NULL, status TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (job_id, status)
+) WITHOUT ROWID;
+"""
+
+# Indexed columns of each table and the document fields they copy
+COLUMNS = {
+    "jobs": {"recruiter_id": "recruiterId"},
+    "applicants": {"job_id": "jobId"},
+    "applications": {"job_id": "job_id"},
+    "messages": {"job_id": "jobId", "recruiter_id": "recruiterId", "applicant_id": "applicantId", "timestamp": "timestamp"},
+}
+
+# Tables whose rows carry a change sequence number (seq), for pollers
+SEQUENCED = {"jobs"}
+
+
+class _ChangeType(enum.Enum):
+    ADDED = 1
+    MODIFIED = 2
+
+
+class _Document:
+    """A row shaped like a Firestore snapshot (id, to_dict()), for job_from_doc and JobCatalog."""
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _Change:
+    def __init__(self, type, document):
+        self.type = type
+        self.document = document
+
+
+def _project(data, fields):
+    if data is None or fields is None:
+        return data
+    return {field: data[field] for field in fields if field in data}
+
+
+def _get(conn, table, doc_id):
+    row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (doc_id,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _get_many(conn, table, doc_ids):
+    doc_ids = list(dict.fromkeys(doc_ids))
+    found = {}
+    for start in range(0, len(doc_ids), SQLITE_IN_CHUNK):
+        chunk = doc_ids[start:start + SQLITE_IN_CHUNK]
+        rows = conn.execute(f"SELECT id, data FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+        found.update((doc_id, json.loads(data)) for doc_id, data in rows)
+    return found
+
+
+def _put(conn, table, doc_id, data):
+    columns = COLUMNS.get(table, {})
+    names = ["id", *columns, "data"]
+    values = [doc_id, *(data.get(field) for field in columns.values()), json.dumps(data)]
+    conn.execute(f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", values)
+    if table in SEQUENCED:
+        # Callers hold the write lock (_transaction), so no other writer takes the same number
+        conn.execute(f"UPDATE {table} SET seq = (SELECT COALESCE(MAX(seq), 0) + 1 FROM {table}) WHERE id = ?", (doc_id,))
+
+
+def _put_many(conn, table, docs):
+    for doc_id, data in docs:
+        _put(conn, table, doc_id, data)
+
+
+def _merge(conn, table, doc_id, data, must_exist=False):
+    current = _get(conn, table, doc_id)
+    if current is None and must_exist:
+        raise LookupError(f"No document {doc_id} in {table}")
+    _put(conn, table, doc_id, {**(current or {}), **data})
+
+
+def _list(conn, table, filters, order_by=(), page_size=None, start_after=None, fields=None):
+    """Page of the rows matching filters (column: value), ordered by the order_by columns then id."""
+    order = [*order_by, "id"]
+    sql = f"SELECT {', '.join(order)}, data FROM {table} WHERE " + " AND ".join(f"{column} = ?" for column in filters)
+    params = list(filters.values())
+    if start_after:
+        values = decode_cursor(start_after)
+        if len(values) != len(order):
+            raise ValueError("Invalid cursor")
+        sql += f" AND ({', '.join(order)}) > ({', '.join('?' * len(order))})"
+        params += values
+    sql += f" ORDER BY {', '.join(order)}"
+    if page_size:
+        sql += " LIMIT ?"
+        params.append(page_size)
+    rows = conn.execute(sql, params).fetchall()
+    items = [(row[-2], _project(json.loads(row[-1]), fields)) for row in rows]
+    next_start_after = None
+    if page_size and len(rows) == page_size:
+        next_start_after = encode_cursor(list(rows[-1][:-1]))
+    return Page(items, next_start_after)
+
+
+def _count(conn, job_id, status, delta):
+    conn.execute(
+        "INSERT INTO job_applicant_stats (job_id, status, count) VALUES (?, ?, ?) "
+        "ON CONFLICT (job_id, status) DO UPDATE SET count = count + excluded.count",
+        (job_id, status, delta)
+    )
+
+
+def _change_status(conn, table, doc_id, new_status, job_field, updates=None):
+    """Same contract as applicant_stats.change_status: returns the data as read, or None."""
+    data = _get(conn, table, doc_id)
+    if data is None:
+        return None
+    _put(conn, table, doc_id, {**data, **(updates or {}), "status": new_status})
+    old_key, new_key = status_key(data.get("status")), status_key(new_status)
+    job_id = data.get(job_field)
+    if job_id and old_key != new_key:
+        _count(conn, job_id, old_key, -1)
+        _count(conn, job_id, new_key, 1)
+    return data
+
+
+def _add_applicant(conn, applicant_id, data):
+    _put(conn, "applicants", applicant_id, data)
+    _count(conn, data["jobId"], status_key(data.get("status")), 1)
+
+
+def _add_application(conn, application_id, data):
+    job_id, candidate_uid = data["job_id"], data["candidate_uid"]
+    job = _get(conn, "jobs", job_id)
+    if job is None:
+        raise LookupError(f"No document {job_id} in jobs")
+    _put(conn, "applications", application_id, data)
+    applicants = job.get("applicants") or []
+    if candidate_uid not in applicants:
+        _put(conn, "jobs", job_id, {**job, "applicants": [*applicants, candidate_uid]})
+    conn.execute(
+        "INSERT OR REPLACE INTO user_applications (uid, job_id, status, applied_at) VALUES (?, ?, 'applied', ?)",
+        (candidate_uid, job_id, data["applied_at"])
+    )
+    _count(conn, job_id, status_key(data.get("status")), 1)
+
+
+def _update_application(conn, application_id, application, updates):
+    new_status = updates.get("status")
+    if not new_status:
+        _merge(conn, "applications", application_id, updates, must_exist=True)
+        return
+    if _change_status(conn, "applications", application_id, new_status, "job_id", updates) is None:
+        raise LookupError(f"No document {application_id} in applications")
+    if application.get("candidate_uid"):
+        conn.execute(
+            "INSERT INTO user_applications (uid, job_id, status) VALUES (?, ?, ?) "
+            "ON CONFLICT (uid, job_id) DO UPDATE SET status = excluded.status",
+            (application["candidate_uid"], application["job_id"], new_status)
+        )
+
+
+def _applicant_summary(conn, recruiter_id):
+    jobs = {}
+    rows = conn.execute(
+        "SELECT jobs.id, json_extract(jobs.data, '$.title'), stats.status, stats.count FROM jobs "
+        "LEFT JOIN job_applicant_stats AS stats ON stats.job_id = jobs.id "
+        "WHERE jobs.recruiter_id = ? ORDER BY jobs.id",
+        (recruiter_id,)
+    )
+    for job_id, title, status, count in rows:
+        job = jobs.setdefault(job_id, {"jobId": job_id, "title": title, "total": 0, "byStatus": {}})
+        if status is not None:
+            job["byStatus"][status] = count
+            job["total"] += count
+    return list(jobs.values())
+
+
+def _all_jobs(conn):
+    return [job_from_doc(_Document(doc_id, json.loads(data))) for doc_id, data in conn.execute("SELECT id, data FROM jobs ORDER BY id")]
+
+
+def _jobs_since(conn, seq=None):
+    """
+    ((id, data) rows, highest seq seen) for jobs written after seq, or for every job
+    when seq is None (rows written before the change sequence existed have none).
+    One statement, so one consistent read.
+    """
+    if seq is None:
+        rows = conn.execute("SELECT id, data, seq FROM jobs").fetchall()
+    else:
+        rows = conn.execute("SELECT id, data, seq FROM jobs WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+    return [(doc_id, json.loads(data)) for doc_id, data, _ in rows], max((row[2] for row in rows if row[2] is not None), default=seq or 0)
+
+
+def _migrate(conn):
+    # Databases created before the change sequence existed
+    if "seq" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+        conn.execute("ALTER TABLE jobs ADD COLUMN seq INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_seq ON jobs (seq)")
+
+
+def _transaction(conn, fn, *args):
+    # BEGIN IMMEDIATE takes the write lock up front, so read-modify-write cannot deadlock
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = fn(conn, *args)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return result
+
+
+class SqliteRepository(Repository):
+    def __init__(self, path, max_workers=SQLITE_THREADS):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="sqlite")
+        self._catalog = None
+        self._poller = None
+        self._stop = threading.Event()
+        self._connect().executescript(SCHEMA)
+        _migrate(self._connect())
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; multi-statement writes go through _transaction
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(*args))
+
+    async def _read(self, fn, *args):
+        return await self._run(lambda: fn(self._connect(), *args))
+
+    async def _write(self, fn, *args):
+        return await self._run(lambda: _transaction(self._connect(), fn, *args))
+
+    def new_id(self, collection):
+        return uuid.uuid4().hex
+
+    def job_catalog(self, tfidf_index=None):
+        from utils.job_catalog import JobCatalog
+        catalog = JobCatalog(None, tfidf_index=tfidf_index)
+        rows, seq = _jobs_since(self._connect())
+        catalog.apply_changes([_Change(_ChangeType.ADDED, _Document(doc_id, data)) for doc_id, data in rows])
+        self._catalog = catalog
+        self._poller = threading.Thread(target=self._poll_jobs, args=(catalog, seq), name="sqlite-job-poll", daemon=True)
+        self._poller.start()
+        return catalog
+
+    def _poll_jobs(self, catalog, seq):
+        # Picks up this process's job writes too, so set_job never waits for the catalog
+        while not self._stop.wait(CATALOG_POLL_SECONDS):
+            try:
+                rows, seq = _jobs_since(self._connect(), seq)
+                if rows:
+                    catalog.apply_changes([_Change(_ChangeType.MODIFIED, _Document(doc_id, data)) for doc_id, data in rows])
+            except Exception as e:
+                print(f"[SqliteRepository] Polling jobs failed: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._poller is not None:
+            self._poller.join()
+        if self._catalog is not None:
+            self._catalog.stop()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    # Users
+
+    async def get_user(self, uid, fields=None):
+        return _project(await self._read(_get, "users", uid), fields)
+
+    async def get_users(self, uids, fields=None):
+        users = await self._read(_get_many, "users", uids)
+        return {uid: _project(data, fields) for uid, data in users.items()}
+
+    async def set_user(self, uid, data, merge=False):
+        await self._write(_merge if merge else _put, "users", uid, data)
+
+    # Recruiters
+
+    async def get_recruiter(self, recruiter_id):
+        return await self._read(_get, "recruiters", recruiter_id)
+
+    async def set_recruiter(self, recruiter_id, data):
+        await self._write(_put, "recruiters", recruiter_id, data)
+
+    async def update_recruiter(self, recruiter_id, data):
+        await self._write(_merge, "recruiters", recruiter_id, data, True)
+
+    # Jobs
+
+    async def get_job(self, job_id):
+        return await self._read(_get, "jobs", job_id)
+
+    async def set_job(self, job_id, data):
+        await self._write(_put, "jobs", job_id, data)
+
+    async def list_jobs(self, recruiter_id, page_size=None, start_after=None, fields=None):
+        return await self._read(_list, "jobs", {"recruiter_id": recruiter_id}, (), page_size, start_after, fields)
+
+    async def all_jobs(self):
+        return await self._read(_all_jobs)
+
+    async def applicant_summary(self, recruiter_id):
+        return await self._read(_applicant_summary, recruiter_id)
+
+    # Applicants
+
+    async def add_applicant(self, applicant_id, data):
+        await self._write(_add_applicant, applicant_id, data)
+
+    async def list_applicants(self, job_id, page_size=None, start_after=None, fields=None):
+        return await self._read(_list, "applicants", {"job_id": job_id}, (), page_size, start_after, fields)
+
+    async def set_applicant_status(self, applicant_id, new_status):
+        return await self._write(_change_status, "applicants", applicant_id, new_status, "jobId") is not None
+
+    # Applications
+
+    async def get_application(self, application_id):
+        return await self._read(_get, "applications", application_id)
+
+    async def add_application(self, application_id, data):
+        await self._write(_add_application, application_id, data)
+
+    async def list_applications(self, job_id, page_size=None, start_after=None, fields=None):
+        return await self._read(_list, "applications", {"job_id": job_id}, (), page_size, start_after, fields)
+
+    async def update_application(self, application_id, application, updates):
+        await self._write(_update_application, application_id, application, updates)
+
+    # Messages
+
+    async def add_message(self, message_id, data):
+        await self._write(_put, "messages", message_id, data)
+
+    async def add_messages(self, messages):
+        messages = list(messages)
+        try:
+            await self._write(_put_many, "messages", messages)
+            return [None] * len(messages)
+        except Exception:
+            # Retry one at a time so only the failing messages are reported
+            return [await self._add_one(message) for message in messages]
+
+    async def _add_one(self, message):
+        try:
+            await self.add_message(*message)
+            return None
+        except Exception as e:
+            return e
+
+    async def list_messages(self, job_id, recruiter_id, applicant_id, page_size=None, start_after=None, fields=None):
+        filters = {"job_id": job_id, "recruiter_id": recruiter_id, "applicant_id": applicant_id}
+        return await self._read(_list, "messages", filters, ("timestamp",), page_size, start_after, fields)
+
+    async def get_bulk_message_job(self, bulk_job_id):
+        return await self._read(_get, "bulk_message_jobs", bulk_job_id)
+
+    async def set_bulk_message_job(self, bulk_job_id, data, merge=False):
+        await self._write(_merge if merge else _put, "bulk_message_jobs", bulk_job_id, data)
@@ -0,0 +1,178 @@
+"""
+JobCatalog driven by an in-memory fake of the Firestore client.
+
+    python -m pytest -q utils/test_job_catalog.py
+"""
+import enum
+
+from utils.job_catalog import JobCatalog
+from utils.tfidf_index import TfidfJobIndex
+
+
+class ChangeType(enum.Enum):
+    ADDED = 1
+    MODIFIED = 2
+    REMOVED = 3
+
+
+class FakeDocument:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeChange:
+    def __init__(self, type, document):
+        self.type = type
+        self.document = document
+
+
+class FakeWatch:
+    def __init__(self, collection, callback):
+        self.collection = collection
+        self.callback = callback
+
+    def unsubscribe(self):
+        self.collection.watches.remove(self)
+
+
+class FakeCollection:
+    """Documents plus on_snapshot listeners; commit() delivers a batch of changes synchronously."""
+
+    def __init__(self):
+        self.docs = {}
+        self.watches = []
+
+    def on_snapshot(self, callback):
+        watch = FakeWatch(self, callback)
+        self.watches.append(watch)
+        # The initial snapshot reports every document as ADDED
+        callback(self._documents(), [FakeChange(ChangeType.ADDED, doc) for doc in self._documents()], None)
+        return watch
+
+    def commit(self, sets=None, deletes=()):
+        changes = []
+        for doc_id, data in (sets or {}).items():
+            change_type = ChangeType.MODIFIED if doc_id in self.docs else ChangeType.ADDED
+            self.docs[doc_id] = data
+            changes.append(FakeChange(change_type, FakeDocument(doc_id, data)))
+        for doc_id in deletes:
+            changes.append(FakeChange(ChangeType.REMOVED, FakeDocument(doc_id, self.docs.pop(doc_id))))
+        for watch in list(self.watches):
+            watch.callback(self._documents(), changes, None)
+
+    def _documents(self):
+        return [FakeDocument(doc_id, data) for doc_id, data in self.docs.items()]
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.collections = {}
+
+    def collection(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+def job(description, *skills):
+    return {'title': description.title(), 'description': description, 'skills': list(skills)}
+
+
+def fake_db(**jobs):
+    db = FakeFirestore()
+    db.collection("jobs").docs.update(jobs)
+    return db
+
+
+def job_ids(snapshot):
+    return [j['job_id'] for j in snapshot.jobs]
+
+
+def test_initial_load_and_changes():
+    db = fake_db(a=job("python developer", "python"), b=job("go developer", "go"))
+    catalog = JobCatalog(db, tfidf_index=TfidfJobIndex(), debounce=0).start()
+    assert catalog.ready and catalog.version == 1
+    assert job_ids(catalog.snapshot()) == ['a', 'b']
+
+    db.collection("jobs").commit(sets={'c': job("rust developer", "rust"), 'a': job("senior python developer", "python")},
+                                 deletes=['b'])
+    snapshot = catalog.snapshot()
+    assert job_ids(snapshot) == ['a', 'c']
+    assert snapshot.jobs[0]['description'] == "senior python developer"
+    assert snapshot.job_matrix.jobs == snapshot.jobs
+    assert 'b' not in snapshot.tfidf_index and 'c' in snapshot.tfidf_index
+
+    catalog.stop()
+    assert not db.collection("jobs").watches
+
+
+def test_version_only_increases_and_snapshots_stay_unchanged():
+    db = fake_db(a=job("python developer", "python"))
+    catalog = JobCatalog(db, debounce=0).start()
+    before = catalog.snapshot()
+    versions = [catalog.version]
+    for i in range(5):
+        db.collection("jobs").commit(sets={f'j{i}': job(f"developer {i}", "python")})
+        versions.append(catalog.version)
+    db.collection("jobs").commit(sets={'a': job("changed", "go")}, deletes=['j0'])
+    versions.append(catalog.version)
+
+    assert versions == sorted(set(versions))
+    assert before.version == 1 and job_ids(before) == ['a']
+    assert before.jobs[0]['description'] == "python developer"
+    catalog.stop()
+
+
+def test_debounce_coalesces_changes_until_flush():
+    db = fake_db(a=job("python developer", "python"))
+    catalog = JobCatalog(db, debounce=60).start()
+    for i in range(10):
+        db.collection("jobs").commit(sets={f'j{i}': job(f"developer {i}", "python")})
+    db.collection("jobs").commit(deletes=['a'])
+    assert catalog.version == 1 and job_ids(catalog.snapshot()) == ['a']
+
+    catalog.flush()
+    assert catalog.version == 2
+    assert job_ids(catalog.snapshot()) == [f'j{i}' for i in range(10)]
+    # Nothing pending, nothing published
+    catalog.flush()
+    assert catalog.version == 2
+    catalog.stop()
+
+
+def test_prebuilt_tfidf_index_is_patched_not_refitted():
+    jobs = {f'j{i:03d}': job(f"python developer role {i}", "python") for i in range(300)}
+    prebuilt = TfidfJobIndex([{'job_id': job_id, **data} for job_id, data in jobs.items()]
+                             + [{'job_id': 'deleted', 'description': "cobol developer"}])
+    jobs['j005'] = job("rust developer", "rust")
+    catalog = JobCatalog(fake_db(**jobs), tfidf_index=prebuilt, debounce=0).start()
+    index = catalog.snapshot().tfidf_index
+    assert index.vectorizer is prebuilt.vectorizer
+    assert len(index) == 300 and 'deleted' not in index
+    assert not index.needs_refit
+    catalog.stop()
+
+
+def test_failed_publish_keeps_changes(monkeypatch):
+    import utils.job_catalog
+
+    db = fake_db(a=job("python developer", "python"), b=job("go developer", "go"))
+    catalog = JobCatalog(db, tfidf_index=TfidfJobIndex(), debounce=60).start()
+    real_matrix = utils.job_catalog.JobMatrix
+
+    def failing_matrix(jobs):
+        raise RuntimeError("rebuild failed")
+
+    monkeypatch.setattr(utils.job_catalog, "JobMatrix", failing_matrix)
+    db.collection("jobs").commit(sets={'c': job("rust developer", "rust")}, deletes=['b'])
+    catalog.flush()
+    assert catalog.version == 1
+
+    monkeypatch.setattr(utils.job_catalog, "JobMatrix", real_matrix)
+    catalog.flush()
+    snapshot = catalog.snapshot()
+    assert snapshot.version == 2 and job_ids(snapshot) == ['a', 'c']
+    assert 'c' in snapshot.tfidf_index and 'b' not in snapshot.tfidf_index
+    catalog.stop()
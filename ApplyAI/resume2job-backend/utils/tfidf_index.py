@@ -0,0 +1,188 @@
+"""
+Persistent TF-IDF index over job descriptions.
+
+The vectorizer is fitted once over the catalog and the job matrix is kept
+sparse and L2-normalized, so a resume query is a transform plus a sparse dot
+product. Jobs can be added and removed without refitting (new terms are only
+picked up by refit()), and the index saves to / loads from disk so workers
+start warm.
+"""
+import os
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+INDEX_FORMAT_VERSION = 1
+# Refit once this share of the rows were added after the last fit
+REFIT_RATIO = 0.5
+
+
+def job_key(job):
+    return job.get('job_id') or job.get('id')
+
+
+def job_text(job):
+    return job.get('description') or ''
+
+
+class TfidfJobIndex:
+    def __init__(self, job_listings=None, **vectorizer_params):
+        self.vectorizer_params = vectorizer_params
+        self.vectorizer = None
+        self.matrix = None
+        self.job_ids = []
+        self._rows = {}
+        # Kept so the index can be refitted without going back to the database
+        self._texts = []
+        self._fitted_rows = 0
+        # (job list, its index rows) from the last rows_for call
+        self._aligned = None
+        if job_listings is not None:
+            self.fit(job_listings)
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def __contains__(self, job_id):
+        return job_id in self._rows
+
+    def fit(self, job_listings):
+        """(Re)build the vocabulary, IDF weights and job matrix from scratch."""
+        jobs = [job for job in job_listings if job_key(job)]
+        self.job_ids = [job_key(job) for job in jobs]
+        self._texts = [job_text(job) for job in jobs]
+        self._rows = {job_id: row for row, job_id in enumerate(self.job_ids)}
+        self._aligned = None
+        self.vectorizer = TfidfVectorizer(**self.vectorizer_params)
+        try:
+            # TfidfVectorizer rows are already L2-normalized
+            self.matrix = self.vectorizer.fit_transform(self._texts).tocsr()
+        except ValueError:
+            # No jobs, or no usable terms in any description
+            self.vectorizer = None
+            self.matrix = sparse.csr_matrix((len(self.job_ids), 0))
+        self._fitted_rows = len(self.job_ids)
+        return self
+
+    def copy(self):
+        """Independent copy that add_jobs/remove_jobs/refit can change without affecting this index."""
+        index = TfidfJobIndex(**self.vectorizer_params)
+        # The fitted vectorizer and matrix are never modified in place, only replaced
+        index.vectorizer = self.vectorizer
+        index.matrix = self.matrix
+        index.job_ids = list(self.job_ids)
+        index._rows = dict(self._rows)
+        index._texts = list(self._texts)
+        index._fitted_rows = self._fitted_rows
+        return index
+
+    def refit(self):
+        return self.fit({'job_id': job_id, 'description': text} for job_id, text in zip(self.job_ids, self._texts))
+
+    @property
+    def needs_refit(self):
+        return self.vectorizer is None or len(self.job_ids) - self._fitted_rows > REFIT_RATIO * max(self._fitted_rows, 1)
+
+    def add_jobs(self, job_listings):
+        """Add or replace jobs using the fitted vocabulary; jobs indexed with the same description are left as they are."""
+        jobs = [job for job in job_listings if job_key(job) and not self._indexed(job)]
+        if not jobs:
+            return
+        if self.vectorizer is None:
+            self.fit([{'job_id': job_id, 'description': text} for job_id, text in zip(self.job_ids, self._texts)] + jobs)
+            return
+        self.remove_jobs([job_key(job) for job in jobs if job_key(job) in self._rows])
+        rows = self.vectorizer.transform([job_text(job) for job in jobs]).tocsr()
+        self.matrix = sparse.vstack([self.matrix, rows], format='csr')
+        self._aligned = None
+        for job in jobs:
+            self._rows[job_key(job)] = len(self.job_ids)
+            self.job_ids.append(job_key(job))
+            self._texts.append(job_text(job))
+
+    def _indexed(self, job):
+        row = self._rows.get(job_key(job))
+        return row is not None and self._texts[row] == job_text(job)
+
+    def remove_jobs(self, job_ids):
+        drop = {self._rows[job_id] for job_id in job_ids if job_id in self._rows}
+        if not drop:
+            return
+        keep = [row for row in range(len(self.job_ids)) if row not in drop]
+        self.matrix = self.matrix[keep]
+        self.job_ids = [self.job_ids[row] for row in keep]
+        self._texts = [self._texts[row] for row in keep]
+        self._rows = {job_id: row for row, job_id in enumerate(self.job_ids)}
+        self._aligned = None
+        # Fitted rows come first; rows added since the last fit do not count against them
+        self._fitted_rows -= sum(1 for row in drop if row < self._fitted_rows)
+
+    def similarities(self, resume_text):
+        """Cosine similarity of the resume against every indexed job (row order of job_ids)."""
+        if self.vectorizer is None or not len(self.job_ids):
+            return np.zeros(len(self.job_ids), dtype=np.float64)
+        query = self.vectorizer.transform([resume_text or ''])
+        return (self.matrix @ query.T).toarray().ravel()
+
+    def rows_for(self, jobs):
+        """
+        Index row of each job listing (-1 when not indexed). Remembered for the last
+        list passed in, so the catalog snapshot's job list is only aligned once rather
+        than on every request.
+        """
+        aligned = self._aligned
+        if aligned is not None and aligned[0] is jobs:
+            return aligned[1]
+        rows = np.fromiter((self._rows.get(job_key(job), -1) for job in jobs), dtype=np.int64, count=len(jobs))
+        self._aligned = (jobs, rows)
+        return rows
+
+    def similarities_for(self, resume_text, jobs):
+        """Cosine similarities aligned with the jobs listings; jobs missing from the index score 0."""
+        scores = self.similarities(resume_text)
+        rows = self.rows_for(jobs)
+        out = np.zeros(len(rows), dtype=np.float64)
+        known = rows >= 0
+        out[known] = scores[rows[known]]
+        return out
+
+    def top_k(self, resume_text, top_k=3):
+        """[(job_id, score)] of the top_k most similar jobs."""
+        scores = self.similarities(resume_text)
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.job_ids[row], float(scores[row])) for row in top.tolist()]
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        joblib.dump({
+            'version': INDEX_FORMAT_VERSION,
+            'vectorizer_params': self.vectorizer_params,
+            'vectorizer': self.vectorizer,
+            'matrix': self.matrix,
+            'job_ids': self.job_ids,
+            'texts': self._texts,
+            'fitted_rows': self._fitted_rows,
+        }, tmp_path)
+        # Atomic replace so a worker never loads a half-written index
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        if state.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported TF-IDF index version: {state.get('version')}")
+        index = cls(**state['vectorizer_params'])
+        index.vectorizer = state['vectorizer']
+        index.matrix = state['matrix']
+        index.job_ids = state['job_ids']
+        index._texts = state['texts']
+        index._fitted_rows = state['fitted_rows']
+        index._rows = {job_id: row for row, job_id in enumerate(index.job_ids)}
+        index._aligned = None
+        return index
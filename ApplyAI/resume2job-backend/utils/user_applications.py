@@ -0,0 +1,51 @@
+"""
+Per-user application state, one document per job in users/{uid}/applications/{job_id}.
+
+It replaces the `applications` array on the user document, which every
+status change had to read, rewrite in full and write back (growing with the
+candidate's history and losing concurrent updates). Applying creates the
+job's document and a status change is one targeted write to it; the helpers
+return (op, ref, data) writes for AsyncFirestore batches and transactions.
+`python manage.py migrate-user-applications` moves existing arrays over.
+"""
+from firebase_admin import firestore
+
+SUBCOLLECTION = "applications"
+LEGACY_FIELD = "applications"
+
+
+def user_application_ref(db, uid, job_id):
+    return db.collection("users").document(uid).collection(SUBCOLLECTION).document(job_id)
+
+
+def applied_write(db, uid, job_id, applied_at, status="applied"):
+    return ("set", user_application_ref(db, uid, job_id), {"job_id": job_id, "status": status, "applied_at": applied_at})
+
+
+def status_write(db, uid, job_id, status):
+    """Status change for one job; merged, so it also works for applications not migrated yet."""
+    return ("merge", user_application_ref(db, uid, job_id), {"job_id": job_id, "status": status})
+
+
+def migration_writes(db, user_snapshot, existing_job_ids=(), keep_array=False):
+    """
+    Writes moving a user's legacy applications array into the subcollection (last
+    entry per job wins). Jobs in existing_job_ids already have a document, kept up
+    to date by status_write since deploy, and are left alone; the rest are created,
+    so a write landing after existing_job_ids was read fails the batch instead of
+    being overwritten with the array's stale status. [] for users without an array.
+    """
+    data = user_snapshot.to_dict() or {}
+    if LEGACY_FIELD not in data:
+        return []
+    entries = {}
+    for app in data[LEGACY_FIELD] or []:
+        if isinstance(app, dict) and app.get("job_id"):
+            entries[app["job_id"]] = {**entries.get(app["job_id"], {}), **app}
+    writes = [
+        ("create", user_application_ref(db, user_snapshot.id, job_id), app)
+        for job_id, app in entries.items() if job_id not in existing_job_ids
+    ]
+    if not keep_array:
+        writes.append(("update", user_snapshot.reference, {LEGACY_FIELD: firestore.DELETE_FIELD}))
+    return writes
@@ -0,0 +1,59 @@
+"""
+Background warm-up of slow-to-load dependencies.
+
+The app registers steps (load the spaCy model, import docling, open the job
+catalog, ...) and starts them on a daemon thread once the server is up, so
+the worker accepts requests right away instead of after every import.
+Anything a request needs before its step has run is loaded on first use
+(the loaders are idempotent), so warm-up only moves the cost off the first
+requests. status() feeds the readiness endpoint.
+"""
+import threading
+import time
+
+
+class Warmup:
+    def __init__(self):
+        # name -> (fn, required)
+        self._steps = {}
+        self._state = {}
+        self._thread = None
+        self._started_at = None
+        self._finished_at = None
+
+    def add(self, name, fn, required=True):
+        """Register a step; a failed step that is not required does not hold back readiness."""
+        self._steps[name] = (fn, required)
+        self._state[name] = {"status": "pending"}
+
+    def start(self):
+        if self._thread is None:
+            self._started_at = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        for name, (fn, required) in self._steps.items():
+            self._state[name] = {"status": "running"}
+            start = time.perf_counter()
+            try:
+                fn()
+                self._state[name] = {"status": "ready", "seconds": round(time.perf_counter() - start, 3)}
+            except Exception as e:
+                print(f"[Warmup] {name} failed: {e}")
+                self._state[name] = {"status": "failed", "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+        self._finished_at = time.perf_counter()
+
+    @property
+    def ready(self):
+        return all(
+            self._state[name]["status"] == "ready" or (not required and self._state[name]["status"] == "failed")
+            for name, (_, required) in self._steps.items()
+        )
+
+    def status(self):
+        elapsed = None
+        if self._started_at is not None:
+            elapsed = round((self._finished_at or time.perf_counter()) - self._started_at, 3)
+        return {"ready": self.ready, "elapsed_seconds": elapsed, "steps": {name: dict(state) for name, state in self._state.items()}}